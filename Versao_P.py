@@ -1,280 +1,809 @@
-import os
 import time
+T0_IMPORTACAO = time.perf_counter()
+import os
+import re
+import numpy as np
 import pandas as pd
-import matplotlib.pyplot as plt
 import concurrent.futures
-from typing import Optional, Tuple, Dict
-from tqdm import tqdm
-from rich.logging import RichHandler
+from typing import NamedTuple, Optional, Tuple, Dict
 import logging
-import shutil
-from datetime import datetime
 import csv
-
-def obter_fatores_por_ramo(ramo_justica: str, sigla_tribunal: str) -> tuple[dict, str]:
-    mapeamento_especial = {
-        'Tribunais Superiores': {
-            'TST': 'Tribunal Superior do Trabalho',
-            'STJ': 'Superior Tribunal de Justiça'
-        },
-        'Justiça Eleitoral': 'Tribunal Superior Eleitoral'
-    }
-
-    if ramo_justica == 'Tribunais Superiores':
-        ramo_usado = mapeamento_especial[ramo_justica].get(sigla_tribunal, ramo_justica)
-    elif ramo_justica == 'Justiça Eleitoral':
-        ramo_usado = mapeamento_especial[ramo_justica]
-    else:
-        ramo_usado = ramo_justica
-
-    if ramo_usado in fatores_metas_por_ramo:
-        return fatores_metas_por_ramo[ramo_usado], ramo_usado
-    else:
-        log.warning(f"[AVISO] Ramo '{ramo_justica}' (tribunal: {sigla_tribunal}) não tem fator específico. Usando padrão JE.")
-        return fatores_padrao_je, 'Justiça Estadual'
-
-logging.basicConfig(level="INFO", format="[%(asctime)s] %(levelname)s: %(message)s", datefmt="%H:%M:%S", handlers=[RichHandler()])
+import shutil
+import multiprocessing
+import argparse
+import itertools
+import threading
+
+from metas_judiciarias import (ANO_COLUNAS_META1, COLUNAS_RESUMO, MOTOR_LEITURA_CSV, EscritorResumoIncremental, aplicar_nomes_do_periodo, acumular_somas, calcular_linha_metas,
+                               calcular_linha_metas_por_vetores, colunas_metas_em_float, criar_executor, definir_ano_colunas,
+                               dividir_em_faixas_de_bytes, ler_csv_completo, ler_csv_em_chunks, ler_csv_metas, ler_faixa_de_bytes, montar_resumo, montar_vetor_somas,
+                               nomes_colunas_do_periodo, salvar_resumo_csv, somar_colunas_metas, uniformizar_colunas_metas)
+from metas_judiciarias.pipeline import EscritorAssincrono, ler_com_antecipacao
+from metas_judiciarias.transporte import SomasCompartilhadas, preparar_rastreador_memoria
+from metas_judiciarias.distribuido import VARIAVEL_CHAVE, iniciar_nos, ler_endereco
+from metas_judiciarias.indice import EntradaIndice, indexar_arquivo
+from metas_judiciarias.binario import carregar_colunas_binarias, salvar_colunas_binarias, somar_colunas_binarias
+from metas_judiciarias.cache import carregar_cache_metas, consultar_cache_metas, consultar_somas_cache, registrar_no_cache, salvar_cache_metas
+from metas_judiciarias.graficos import (carregar_manifesto_graficos, graficos_desatualizados, planejar_graficos, renderizar_graficos,
+                                        salvar_manifesto_graficos)
+from metas_judiciarias.referencia import calcular_metas_referencia
+from metas_judiciarias.agregacao import (agregar_nacional, agregar_por_mapeamento, agregar_por_ramo, carregar_mapeamento_grupos,
+                                         montar_tabela_somas, salvar_agregacao, salvar_tabela_somas, tribunais_sem_grupo)
+from metas_judiciarias.metricas import (coletar_instrumentacao, configurar_instrumentacao, medir_arquivo, medir_etapa,
+                                        medir_pico_memoria_mb, perfilar_tarefa, registrar_etapa, registrar_evento, salvar_metricas,
+                                        salvar_rastreamento, somar_tempos_etapas)
+
+# matplotlib, tqdm e rich só são importados no processo principal e quando usados: os workers sobem só com pandas/numpy.
 log = logging.getLogger("rich")
 
+def configurar_log(usar_rich: bool = True):
+    manipuladores = None
+    if usar_rich:
+        from rich.logging import RichHandler
+        manipuladores = [RichHandler()]
+    logging.basicConfig(level="INFO", format="[%(asctime)s] %(levelname)s: %(message)s", datefmt="%H:%M:%S", handlers=manipuladores)
+
 PASTA_CSV = 'dados'
 PASTA_RESULTADOS = 'resultados_versao_P'
-PASTA_TEMP = os.path.join(PASTA_RESULTADOS, 'temp_para_consolidacao')
 ARQUIVO_RESUMO = os.path.join(PASTA_RESULTADOS, 'ResumoMetas.csv')
 ARQUIVO_CONSOLIDADO = os.path.join(PASTA_RESULTADOS, 'Consolidado.csv')
 GRAFICO_META1 = os.path.join(PASTA_RESULTADOS, 'grafico_meta1.png')
-
-fatores_metas_por_ramo = {
-    'Justiça Estadual': {'2a': 1000/8, '2b': 1000/9, '2c': 1000/9.5, '2ant': 100,
-                          '4a': 1000/6.5, '4b': 100, '6': 100, '7a': 1000/5, '7b': 1000/5,
-                          '8a': 1000/7.5, '8b': 1000/9, '10a': 1000/9, '10b': 1000/10},
-    'Justiça do Trabalho': {'2a': 1000/9.4, '2ant': 100, '4a': 1000/7, '4b': 100},
-    'Justiça Federal': {'2a': 1000/8.5, '2b': 100, '2ant': 100, '4a': 1000/7, '4b': 100,
-                         '6': 1000/3.5, '7a': 1000/3.5, '7b': 1000/3.5, '8a': 1000/7.5,
-                         '8b': 1000/9, '10a': 100},
-    'Justiça Militar da União': {'2a': 1000/9.5, '2b': 1000/9.9, '2ant': 100,
-                                  '4a': 1000/9.5, '4b': 1000/9.9},
-    'Justiça Militar Estadual': {'2a': 1000/9, '2b': 1000/9.5, '2ant': 100,
-                                  '4a': 1000/9.5, '4b': 1000/9.9},
-    'Tribunal Superior Eleitoral': {'2a': 1000/7.0, '2b': 1000/9.9, '2ant': 100,
-                                     '4a': 1000/9, '4b': 1000/5},
-    'Tribunal Superior do Trabalho': {'2a': 1000/8.5, '2b': 1000/9.9, '2ant': 100,
-                                       '4a': 1000/7, '4b': 100},
-    'Superior Tribunal de Justiça': {'2ant': 100, '4a': 1000/9, '4b': 100,
-                                      '6': 1000/7.5, '7a': 1000/7.5, '7b': 1000/7.5,
-                                      '8': 1000/10, '10': 1000/10}
-}
-fatores_padrao_je = fatores_metas_por_ramo['Justiça Estadual']
-
-def calcular_meta_geral(df: pd.DataFrame, col_j: str, col_d: str, col_s: str, fator: Optional[float]) -> str | float:
-    try:
-        if not all(col in df.columns and df[col].notna().any() for col in (col_j, col_d, col_s)):
-            return 'NA'
-        
-        numerador = df[col_j].sum()
-        if pd.isna(numerador):
-            return 'NA'
-            
-        den = df[col_d].sum() - df[col_s].sum()
-        
-        if den == 0 or fator == 'NA' or pd.isna(fator):
-            return 'NA'
-            
-        return round((numerador / den) * fator, 2)
-    except Exception:
-        return 'NA'
-
-def gerar_grafico(df: pd.DataFrame, nome_meta: str, caminho_img: str):
-    df_plot = df.copy()
-    df_plot[nome_meta + '_val'] = pd.to_numeric(df_plot[nome_meta], errors='coerce')
-    df_plot = df_plot.dropna(subset=[nome_meta + '_val'])
-    if df_plot.empty:
-        log.warning(f"Sem dados válidos para o gráfico de {nome_meta}")
+GERAR_GRAFICO = True
+GRAFICOS_POR_RAMO = True
+PASTA_GRAFICOS = os.path.join(PASTA_RESULTADOS, 'graficos')
+GERAR_CONSOLIDADO = True
+FORMATO_CONSOLIDADO = 'csv'
+COLUNAS_PARTICAO_PARQUET = ['ramo_justica', 'sigla_tribunal']
+DIRETORIO_CONSOLIDADO_PARQUET = os.path.join(PASTA_RESULTADOS, 'Consolidado_parquet')
+GERAR_RESUMO_PARQUET = False
+USAR_CACHE_METAS = True
+VERIFICAR_PARIDADE_METAS = False
+ARQUIVO_CACHE_METAS = os.path.join(PASTA_RESULTADOS, 'cache_metas.json')
+ARQUIVO_RESUMO_PARQUET = os.path.join(PASTA_RESULTADOS, 'ResumoMetas.parquet')
+ARQUIVO_SERIE_HISTORICA = os.path.join(PASTA_RESULTADOS, 'SerieHistoricaMetas.csv')
+GERAR_AGREGACOES = True
+ARQUIVO_SOMAS_TRIBUNAIS = os.path.join(PASTA_RESULTADOS, 'SomasTribunais.csv')
+ARQUIVO_METAS_POR_RAMO = os.path.join(PASTA_RESULTADOS, 'ResumoMetasPorRamo.csv')
+ARQUIVO_METAS_NACIONAL = os.path.join(PASTA_RESULTADOS, 'ResumoMetasNacional.csv')
+# CSV sigla_tribunal;grupo (ex.: regiões); com ele, também é gerado ARQUIVO_METAS_POR_GRUPO.
+ARQUIVO_GRUPOS_TRIBUNAIS: Optional[str] = None
+ARQUIVO_METAS_POR_GRUPO = os.path.join(PASTA_RESULTADOS, 'ResumoMetasPorGrupo.csv')
+USAR_CACHE_BINARIO = True
+PASTA_CACHE_BINARIO = os.path.join(PASTA_RESULTADOS, 'cache_binario')
+TIPO_EXECUTOR = 'processos'
+TAMANHO_CHUNK_LINHAS: Optional[int] = None
+TAMANHO_FAIXA_BYTES: Optional[int] = None
+TAMANHO_LOTE_BYTES = 4 * 1024 * 1024
+PIPELINE_ASSINCRONO = False
+TRANSPORTE_MEMORIA_COMPARTILHADA = True
+ENDERECO_COORDENADOR = '127.0.0.1:0'
+MAX_TENTATIVAS_TAREFA = 3
+
+class Periodo(NamedTuple):
+    rotulo: str
+    pasta_csv: str
+    pasta_resultados: str
+    ano_colunas: str = ANO_COLUNAS_META1
+    indice: int = 0
+
+    def caminho(self, caminho_padrao: str) -> str:
+        # Os caminhos das constantes acima, levados para a pasta de resultados do período.
+        return os.path.join(self.pasta_resultados, os.path.relpath(caminho_padrao, PASTA_RESULTADOS))
+
+def planejar_tarefas(arquivos_indexados: list[Tuple[int, str]], num_total: int, num_workers: int,
+                     indice_arquivos: Dict[str, EntradaIndice]) -> list[Tuple[int, str, object]]:
+    # Tamanhos e colunas vêm da pré-varredura; cada tarefa leva as colunas que o worker deve ler.
+    tamanhos = [indice_arquivos[caminho].tamanho for _, caminho in arquivos_indexados]
+    # Lotes menores que o limite global quando há poucos dados, para não deixar workers ociosos.
+    limite_lote = min(TAMANHO_LOTE_BYTES, max(1, sum(tamanhos) // (num_workers * 4)))
+
+    tarefas = []
+    arquivos_pequenos = []
+    # Cada faixa tem a sua linha na memória compartilhada das somas, depois das linhas reservadas aos arquivos.
+    proxima_posicao_faixa = num_total
+    for (idx, caminho_arq), tamanho in zip(arquivos_indexados, tamanhos):
+        colunas_usadas = indice_arquivos[caminho_arq].colunas_usadas
+        if TAMANHO_FAIXA_BYTES and tamanho > TAMANHO_FAIXA_BYTES:
+            for num_faixa, (inicio, fim) in enumerate(dividir_em_faixas_de_bytes(caminho_arq, TAMANHO_FAIXA_BYTES)):
+                tarefas.append((fim - inicio, 'faixa', (caminho_arq, idx, num_faixa, inicio, fim, proxima_posicao_faixa, colunas_usadas)))
+                proxima_posicao_faixa += 1
+        elif tamanho < limite_lote:
+            arquivos_pequenos.append((tamanho, (caminho_arq, idx, num_total, colunas_usadas)))
+        else:
+            tarefas.append((tamanho, 'lote', [(caminho_arq, idx, num_total, colunas_usadas)]))
+
+    lote, bytes_lote = [], 0
+    for tamanho, tarefa in sorted(arquivos_pequenos, key=lambda item: item[0], reverse=True):
+        if lote and bytes_lote + tamanho > limite_lote:
+            tarefas.append((bytes_lote, 'lote', lote))
+            lote, bytes_lote = [], 0
+        lote.append(tarefa)
+        bytes_lote += tamanho
+    if lote:
+        tarefas.append((bytes_lote, 'lote', lote))
+
+    # LPT: as maiores tarefas primeiro, para que nenhum arquivo grande fique para o final.
+    tarefas.sort(key=lambda tarefa: tarefa[0], reverse=True)
+    return tarefas
+
+def executar_tarefa(tipo_tarefa: str, argumentos, contexto_periodo: tuple) -> Tuple[int, float, list, dict]:
+    t0_tarefa = time.perf_counter()
+    ativar_periodo(*contexto_periodo)
+    with perfilar_tarefa():
+        if tipo_tarefa == 'faixa':
+            caminho_arq, _, num_faixa, inicio, fim, *_ = argumentos
+            with medir_arquivo(os.path.basename(caminho_arq), faixa=num_faixa, bytes=fim - inicio):
+                resultados = [processar_faixa_de_bytes(argumentos)]
+        else:
+            # Com o pipeline, o próximo arquivo do lote é lido em segundo plano enquanto o atual é calculado e gravado. A antecipação
+            # não passa de uma tarefa para a outra: num lote de um arquivo só a escrita fica sobreposta.
+            antecipar_leitura = PIPELINE_ASSINCRONO and not TAMANHO_CHUNK_LINHAS and not cache_binario_ativo()
+            leituras = (ler_com_antecipacao(argumentos, ler_arquivo_da_tarefa) if antecipar_leitura
+                        else ((tarefa, None) for tarefa in argumentos))
+            resultados = []
+            for tarefa, leitura_antecipada in leituras:
+                with medir_arquivo(os.path.basename(tarefa[0]), bytes=os.path.getsize(tarefa[0])) as detalhes_arquivo:
+                    resultados.append(processar_arquivo_individual(tarefa, leitura_antecipada))
+                    detalhes_arquivo['linhas_consolidadas'] = resultados[-1][2]
+        escritor_consolidado = escritor_da_thread()
+        if escritor_consolidado is not None:
+            # A tarefa só é entregue depois que as suas partes do consolidado estão no disco.
+            with medir_etapa('espera_escrita'):
+                falhas_escrita = escritor_consolidado.aguardar()
+            for nome_falho, e_escrita in falhas_escrita.items():
+                log.error(f"[ERRO] Falha ao gravar o consolidado do arquivo {nome_falho}: {e_escrita}", exc_info=e_escrita)
+            if falhas_escrita:
+                resultados = marcar_falhas_de_escrita(tipo_tarefa, argumentos, resultados, falhas_escrita)
+    return os.getpid(), time.perf_counter() - t0_tarefa, resultados, coletar_instrumentacao()
+
+def marcar_falhas_de_escrita(tipo_tarefa: str, argumentos, resultados: list, falhas_escrita: dict) -> list:
+    # Só o arquivo cuja escrita falhou vira erro; os outros do mesmo lote seguem com o que já calcularam.
+    if tipo_tarefa == 'faixa':
+        return [None]
+    return [(None, None, 0, f"Erro crítico no arquivo {os.path.basename(tarefa[0])}")
+            if os.path.basename(tarefa[0]) in falhas_escrita else resultado
+            for tarefa, resultado in zip(argumentos, resultados)]
+
+def registrar_utilizacao_workers(uso_por_worker: Dict[int, list], tempo_paralelo: float, num_workers: int):
+    if not uso_por_worker or tempo_paralelo <= 0:
+        return
+    log.info("===== UTILIZAÇÃO DOS WORKERS =====")
+    for pid, (num_tarefas, bytes_processados, tempo_ocupado) in sorted(uso_por_worker.items()):
+        log.info(f"Worker {pid}: {num_tarefas} tarefas, {bytes_processados / 1024 / 1024:.1f} MB, "
+                 f"{tempo_ocupado:.2f}s ocupado ({tempo_ocupado / tempo_paralelo:.0%})")
+    tempos_ocupados = [uso[2] for uso in uso_por_worker.values()]
+    media_ocupada = sum(tempos_ocupados) / num_workers
+    log.info(f"Utilização média: {media_ocupada / tempo_paralelo:.0%} | "
+             f"desbalanceamento (máx/média): {max(tempos_ocupados) / media_ocupada if media_ocupada else 0:.2f}")
+
+def gerar_graficos_metas(executor: concurrent.futures.Executor, tipo_executor: str, df_resumo: pd.DataFrame, periodo: Periodo,
+                         num_workers: int):
+    # Um gráfico por meta (e por meta e ramo); só os que mudaram desde a última execução são desenhados, em lotes nos workers.
+    pasta_graficos = periodo.caminho(PASTA_GRAFICOS)
+    graficos = planejar_graficos(df_resumo, pasta_graficos, {'meta1': periodo.caminho(GRAFICO_META1)}, por_ramo=GRAFICOS_POR_RAMO)
+    if not graficos:
+        log.warning("Sem dados válidos para os gráficos das metas")
+        return
+    caminho_manifesto = os.path.join(pasta_graficos, 'manifesto.json')
+    manifesto = carregar_manifesto_graficos(caminho_manifesto)
+    pendentes = graficos_desatualizados(graficos, manifesto)
+    caminhos_pendentes = {grafico.caminho for grafico in pendentes}
+    for grafico in pendentes:
+        os.makedirs(os.path.dirname(grafico.caminho), exist_ok=True)
+
+    desenhados = set()
+    if tipo_executor in ('processos', 'distribuido'):
+        tamanho_lote = max(1, -(-len(pendentes) // (num_workers * 2)))
+        futuros = [executor.submit(renderizar_graficos, pendentes[inicio:inicio + tamanho_lote])
+                   for inicio in range(0, len(pendentes), tamanho_lote)]
+        for futuro in concurrent.futures.as_completed(futuros):
+            try:
+                desenhados.update(futuro.result())
+            except Exception as e_grafico:
+                log.error(f"[ERRO] Falha ao desenhar gráficos: {e_grafico}")
+    else:
+        # Serial ou threads: desenha aqui mesmo, um por vez.
+        for grafico in pendentes:
+            try:
+                desenhados.update(renderizar_graficos([grafico]))
+            except Exception as e_grafico:
+                log.error(f"[ERRO] Falha ao desenhar {grafico.caminho}: {e_grafico}")
+
+    caminhos_atuais = {grafico.caminho for grafico in graficos}
+    for caminho_antigo in set(manifesto) - caminhos_atuais:
+        # Meta ou ramo que saiu do resumo: o gráfico antigo não fica para trás.
+        if os.path.exists(caminho_antigo):
+            os.remove(caminho_antigo)
+    salvar_manifesto_graficos({grafico.caminho: grafico.assinatura() for grafico in graficos
+                               if grafico.caminho in desenhados or grafico.caminho not in caminhos_pendentes}, caminho_manifesto)
+    log.info(f"Gráficos: {len(desenhados)} desenhados, {len(graficos) - len(pendentes)} sem mudança ({pasta_graficos})")
+
+periodo_atual = Periodo('', PASTA_CSV, PASTA_RESULTADOS)
+deslocamentos_consolidado: Optional[list] = None
+deslocamento_consolidado = None
+escritores_consolidado = threading.local()
+somas_compartilhadas: Optional[SomasCompartilhadas] = None
+
+def inicializar_worker(deslocamentos_compartilhados: Optional[list], rastrear: bool = False, pasta_perfil: Optional[str] = None,
+                       instante_criacao_pool: Optional[float] = None):
+    global deslocamentos_consolidado
+    # Um contador por período: objetos sincronizados só chegam aos workers por herança, então todos são criados antes do pool.
+    deslocamentos_consolidado = deslocamentos_compartilhados
+    configurar_instrumentacao(rastrear, pasta_perfil)
+    if not logging.getLogger().handlers:
+        # Worker iniciado com spawn: sem o rich, só o logging padrão para os erros.
+        configurar_log(usar_rich=False)
+    if instante_criacao_pool is not None:
+        # Da criação do pool até aqui: subida do processo e importações do worker (quase nada com fork).
+        registrar_etapa('inicializacao_worker', instante_criacao_pool, max(0.0, time.time() - instante_criacao_pool), {'pid': os.getpid()})
+
+def escritor_da_thread() -> Optional[EscritorAssincrono]:
+    # Um escritor por thread: com o executor de threads, o erro de escrita de uma tarefa não é levantado em outra.
+    if not (PIPELINE_ASSINCRONO and GERAR_CONSOLIDADO):
+        return None
+    if getattr(escritores_consolidado, 'escritor', None) is None:
+        escritores_consolidado.escritor = EscritorAssincrono()
+    return escritores_consolidado.escritor
+
+def ativar_periodo(periodo: Periodo, memoria_somas: Optional[Tuple[str, int]] = None, consolidado_preparado: bool = False):
+    # Cada tarefa traz o seu período, então o mesmo pool atende vários períodos em sequência.
+    global periodo_atual, deslocamento_consolidado, somas_compartilhadas
+    periodo_atual = periodo
+    definir_ano_colunas(periodo.ano_colunas)
+    deslocamento_consolidado = (deslocamentos_consolidado[periodo.indice]
+                                if consolidado_preparado and deslocamentos_consolidado is not None else None)
+    if memoria_somas is not None and (somas_compartilhadas is None or somas_compartilhadas.nome != memoria_somas[0]):
+        # Com threads ou serial a instância do processo principal já está aqui. Nos workers a memória é aberta pelo nome, mesmo
+        # com fork: o pool sobe antes dela (pré-varredura) e cada período do modo em lote tem a sua.
+        if somas_compartilhadas is not None:
+            somas_compartilhadas.desconectar()
+        somas_compartilhadas = SomasCompartilhadas(memoria_somas[1], nome=memoria_somas[0])
+
+def entregar_somas(posicao: int, somas_colunas: Dict[str, float], colunas_com_valor: set) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    vetores_somas = montar_vetor_somas(somas_colunas, colunas_com_valor)
+    if somas_compartilhadas is None:
+        return vetores_somas
+    somas_compartilhadas.gravar(posicao, *vetores_somas)
+    return None
+
+def receber_somas(posicoes: list[int], vetores_transportados: list) -> Tuple[np.ndarray, np.ndarray]:
+    if somas_compartilhadas is not None:
+        return somas_compartilhadas.ler(posicoes)
+    return (np.sum([vetor_somas for vetor_somas, _ in vetores_transportados], axis=0),
+            np.any([vetor_com_valor for _, vetor_com_valor in vetores_transportados], axis=0))
+
+def extrair_identificacao(df: pd.DataFrame) -> Dict[str, str]:
+    return {col: df[col].iloc[0] for col in ('sigla_tribunal', 'ramo_justica') if col in df.columns}
+
+def formatar_cabecalho_consolidado(colunas: list[str]) -> bytes:
+    return pd.DataFrame(columns=colunas).to_csv(index=False, encoding='utf-8', sep=';', quoting=csv.QUOTE_NONNUMERIC).encode('utf-8')
+
+def prefixo_particao_parquet(nome_do_arquivo: str) -> str:
+    return f"parte-{os.path.splitext(nome_do_arquivo)[0].replace(' ', '_')}-"
+
+def remover_particoes_parquet(nomes_arquivos: set[str]):
+    prefixos = tuple(prefixo_particao_parquet(nome) for nome in nomes_arquivos)
+    if not prefixos:
         return
+    for pasta_atual, _, arquivos_pasta in os.walk(periodo_atual.caminho(DIRETORIO_CONSOLIDADO_PARQUET)):
+        for nome_parte in arquivos_pasta:
+            if nome_parte.startswith(prefixos):
+                os.remove(os.path.join(pasta_atual, nome_parte))
+
+def escrever_particao_parquet(df: pd.DataFrame, nome_do_arquivo: str, num_parte: int) -> int:
+    nome_parte = f"{prefixo_particao_parquet(nome_do_arquivo)}{num_parte:05d}"
+    df = colunas_metas_em_float(df)
+    diretorio_parquet = periodo_atual.caminho(DIRETORIO_CONSOLIDADO_PARQUET)
+    if all(c in df.columns for c in COLUNAS_PARTICAO_PARQUET):
+        df.to_parquet(diretorio_parquet, index=False, partition_cols=COLUNAS_PARTICAO_PARQUET,
+                      basename_template=nome_parte + "-{i}.parquet")
+    else:
+        # Pastas iniciadas por '_' são ignoradas na leitura do dataset, mas os dados continuam disponíveis.
+        pasta_sem_identificacao = os.path.join(diretorio_parquet, '_sem_identificacao')
+        os.makedirs(pasta_sem_identificacao, exist_ok=True)
+        df.to_parquet(os.path.join(pasta_sem_identificacao, nome_parte + ".parquet"), index=False)
+    return len(df)
+
+def escrever_no_consolidado(df: pd.DataFrame, nome_do_arquivo: str, num_parte: int = 0) -> int:
+    if FORMATO_CONSOLIDADO != 'parquet' and deslocamento_consolidado is None:
+        return 0
+    escritor_consolidado = escritor_da_thread()
+    if escritor_consolidado is not None:
+        escritor_consolidado.enviar(nome_do_arquivo, gravar_no_consolidado, df, nome_do_arquivo, num_parte)
+        return len(df)
+    return gravar_no_consolidado(df, nome_do_arquivo, num_parte)
+
+def gravar_no_consolidado(df: pd.DataFrame, nome_do_arquivo: str, num_parte: int) -> int:
+    with medir_etapa('consolidado', arquivo=nome_do_arquivo, parte=num_parte, linhas=len(df)):
+        if FORMATO_CONSOLIDADO == 'parquet':
+            return escrever_particao_parquet(df, nome_do_arquivo, num_parte)
+        dados = df.to_csv(index=False, header=False, encoding='utf-8', sep=';', quoting=csv.QUOTE_NONNUMERIC).encode('utf-8')
+        # Reserva uma região exclusiva do arquivo final; a escrita em si acontece fora do lock, em paralelo com os outros workers.
+        with deslocamento_consolidado.get_lock():
+            inicio = deslocamento_consolidado[0]
+            deslocamento_consolidado[0] += len(dados)
+        with open(periodo_atual.caminho(ARQUIVO_CONSOLIDADO), 'r+b') as f_consolidado:
+            f_consolidado.seek(inicio)
+            f_consolidado.write(dados)
+        # Só conta depois de gravada: uma região reservada e não preenchida deixa o total abaixo do reservado.
+        with deslocamento_consolidado.get_lock():
+            deslocamento_consolidado[1] += len(dados)
+        return len(df)
+
+def invalidar_consolidado(periodo: Periodo, bytes_faltando: int) -> str:
+    # Uma escrita que falhou (ou um worker que caiu) depois de reservar a sua região deixa um buraco de bytes nulos no meio
+    # do arquivo; renomeado, ele não é confundido com um consolidado completo.
+    caminho_consolidado = periodo.caminho(ARQUIVO_CONSOLIDADO)
+    caminho_incompleto = f"{os.path.splitext(caminho_consolidado)[0]}_incompleto.csv"
+    os.replace(caminho_consolidado, caminho_incompleto)
+    log.error(f"[ERRO] {bytes_faltando} bytes reservados no consolidado não foram gravados; arquivo renomeado para {caminho_incompleto}")
+    return f"Erro crítico no consolidado: {bytes_faltando} bytes não gravados ({caminho_incompleto})"
+
+def preparar_consolidado(caminhos_arquivos: list[str]) -> Optional[int]:
+    for caminho_arq in caminhos_arquivos:
+        try:
+            amostra = pd.read_csv(caminho_arq, sep=',', encoding='utf-8', on_bad_lines='skip', nrows=1)
+        except Exception:
+            continue
+        if amostra.empty:
+            continue
+        cabecalho = formatar_cabecalho_consolidado(amostra.columns.tolist())
+        with open(periodo_atual.caminho(ARQUIVO_CONSOLIDADO), 'wb') as f_consolidado:
+            f_consolidado.write(cabecalho)
+        return len(cabecalho)
+    return None
+
+def processar_arquivo_em_chunks(caminho_do_arquivo: str, idx: int, tamanho_chunk: int,
+                                colunas_usadas: tuple = ()) -> Tuple[Optional[tuple], Optional[Dict], int, Optional[str]]:
+    nome_do_arquivo = os.path.basename(caminho_do_arquivo)
+    linhas_consolidadas = 0
+    somas_colunas: Dict[str, float] = {}
+    colunas_com_valor: set = set()
+    identificacao = None
+
+    with ler_csv_em_chunks(caminho_do_arquivo, tamanho_chunk, todas_colunas=GERAR_CONSOLIDADO, colunas_usadas=colunas_usadas) as leitor_chunks:
+        num_chunk = 0
+        while True:
+            with medir_etapa('leitura', arquivo=nome_do_arquivo, chunk=num_chunk):
+                chunk = next(leitor_chunks, None)
+            if chunk is None:
+                break
+            num_chunk += 1
+            if chunk.empty:
+                continue
+            if GERAR_CONSOLIDADO:
+                chunk = uniformizar_colunas_metas(chunk)
+                linhas_consolidadas += escrever_no_consolidado(chunk, nome_do_arquivo, num_chunk - 1)
+            chunk = aplicar_nomes_do_periodo(chunk)
+            if identificacao is None:
+                identificacao = extrair_identificacao(chunk)
+
+            with medir_etapa('calculo'):
+                acumular_somas(somas_colunas, colunas_com_valor, *somar_colunas_metas(chunk))
+
+    if identificacao is None:
+        return None, None, 0, None
+    return entregar_somas(idx - 1, somas_colunas, colunas_com_valor), identificacao, linhas_consolidadas, None
+
+def montar_resultado_por_somas(nome_do_arquivo: str, idx: int, total_arquivos: int, posicoes: list[int], vetores_transportados: list,
+                               identificacao: Optional[Dict], linhas_consolidadas: int, aviso_processamento: Optional[str] = None,
+                               somas_tribunais: Optional[Dict[int, np.ndarray]] = None) -> Tuple[Optional[Dict], int, Optional[str]]:
+    # Roda no processo principal: os workers só devolvem as somas (na memória compartilhada) e a identificação do tribunal.
+    if identificacao is None:
+        return None, linhas_consolidadas, aviso_processamento or f"Arquivo {nome_do_arquivo} ({idx}/{total_arquivos}) vazio."
+
+    if 'sigla_tribunal' not in identificacao or 'ramo_justica' not in identificacao:
+        return None, linhas_consolidadas, f"Arquivo {nome_do_arquivo} sem coluna 'sigla_tribunal' ou 'ramo_justica'"
+
+    with medir_etapa('calculo'):
+        vetor_somas, vetor_com_valor = receber_somas(posicoes, vetores_transportados)
+        linha_resultado_final = calcular_linha_metas_por_vetores(vetor_somas, vetor_com_valor,
+                                                                 identificacao['sigla_tribunal'], identificacao['ramo_justica'])
+    if somas_tribunais is not None:
+        # Guardadas para as agregações por grupo: NaN onde a coluna não tem valor.
+        somas_tribunais[idx] = np.where(vetor_com_valor, vetor_somas, np.nan)
+    return linha_resultado_final, linhas_consolidadas, aviso_processamento
+
+def processar_faixa_de_bytes(args: Tuple[str, int, int, int, int, int, tuple]) -> Optional[Tuple[Optional[tuple], Optional[Dict], int, Optional[str]]]:
+    caminho_do_arquivo, idx, num_faixa, inicio, fim, posicao, colunas_usadas = args
+    nome_do_arquivo = os.path.basename(caminho_do_arquivo)
+    try:
+        with medir_etapa('leitura', arquivo=nome_do_arquivo, faixa=num_faixa) as detalhes_leitura:
+            df = ler_faixa_de_bytes(caminho_do_arquivo, inicio, fim, todas_colunas=GERAR_CONSOLIDADO, colunas_usadas=colunas_usadas)
+            detalhes_leitura['linhas'] = len(df)
 
-    df_plot = df_plot.sort_values(by=nome_meta + '_val', ascending=False)
-    plt.figure(figsize=(max(16, len(df_plot) * 0.6), 10))
-    plt.bar(df_plot['sigla_tribunal'], df_plot[nome_meta + '_val'], color='steelblue')
-    plt.title(f'Comparativo {nome_meta.upper()}')
-    plt.xticks(rotation=90, fontsize=8)
-    plt.tight_layout()
-    plt.savefig(caminho_img)
-    plt.close()
-    log.info(f"Gráfico salvo em {caminho_img}")
-
-def processar_arquivo_individual(args: Tuple[str, int, int]) -> Optional[Tuple[Dict, str, Optional[str]]]:
-    caminho_do_arquivo, idx, total_arquivos = args
+        if df.empty:
+            return None, None, 0, None
+
+        linhas_consolidadas = 0
+        if GERAR_CONSOLIDADO:
+            df = uniformizar_colunas_metas(df)
+            linhas_consolidadas = escrever_no_consolidado(df, nome_do_arquivo, num_faixa)
+        df = aplicar_nomes_do_periodo(df)
+        with medir_etapa('calculo'):
+            vetores_faixa = entregar_somas(posicao, *somar_colunas_metas(df))
+        return vetores_faixa, extrair_identificacao(df), linhas_consolidadas, None
+    except Exception as e_faixa:
+        log.error(f"[ERRO] Falha na faixa {num_faixa} ({inicio}-{fim}) do arquivo {nome_do_arquivo}: {e_faixa}", exc_info=True)
+        return None
+
+def combinar_faixas(caminho_do_arquivo: str, idx: int, total_arquivos: int, resultados_faixas: list, num_faixas_planejadas: int,
+                    somas_tribunais: Optional[Dict[int, np.ndarray]] = None) -> Tuple[Optional[Dict], int, Optional[str]]:
+    nome_do_arquivo = os.path.basename(caminho_do_arquivo)
+    linhas_consolidadas = sum(r[2] for _, r in resultados_faixas if r)
+    # Uma faixa que falhou (no worker ou no próprio executor) deixaria as somas do tribunal incompletas.
+    num_faixas_ok = sum(1 for _, r in resultados_faixas if r is not None)
+    if num_faixas_ok < num_faixas_planejadas:
+        return None, linhas_consolidadas, (f"Erro crítico no arquivo {nome_do_arquivo} "
+                                           f"({num_faixas_planejadas - num_faixas_ok} de {num_faixas_planejadas} faixas falharam)")
+
+    faixas_com_dados = [(posicao, r) for posicao, r in resultados_faixas if r[1] is not None]
+    identificacao = faixas_com_dados[0][1][1] if faixas_com_dados else None
+    return montar_resultado_por_somas(nome_do_arquivo, idx, total_arquivos, [posicao for posicao, _ in faixas_com_dados],
+                                      [r[0] for _, r in faixas_com_dados], identificacao, linhas_consolidadas,
+                                      somas_tribunais=somas_tribunais)
+
+def processar_arquivo_binario(caminho_do_arquivo: str, idx: int, colunas_usadas: tuple = ()) -> Optional[Tuple[Optional[tuple], Dict, int, Optional[str]]]:
+    with medir_etapa('leitura', arquivo=os.path.basename(caminho_do_arquivo), binario=True) as detalhes_leitura:
+        dados_binarios = carregar_colunas_binarias(periodo_atual.caminho(PASTA_CACHE_BINARIO), caminho_do_arquivo,
+                                                   nomes_colunas_do_periodo(colunas_usadas))
+        detalhes_leitura['acerto'] = dados_binarios is not None
+    if dados_binarios is None:
+        return None
+    colunas_binarias, manifesto = dados_binarios
+    with medir_etapa('calculo'):
+        vetores_somas = entregar_somas(idx - 1, *somar_colunas_binarias(colunas_binarias))
+    return vetores_somas, {'sigla_tribunal': manifesto['sigla_tribunal'], 'ramo_justica': manifesto['ramo_justica']}, 0, None
+
+def cache_binario_ativo() -> bool:
+    return USAR_CACHE_BINARIO and not GERAR_CONSOLIDADO and not VERIFICAR_PARIDADE_METAS
+
+def ler_arquivo_da_tarefa(args: Tuple[str, int, int, tuple]) -> pd.DataFrame:
+    caminho_do_arquivo, _, _, colunas_usadas = args
+    with medir_etapa('leitura', arquivo=os.path.basename(caminho_do_arquivo)) as detalhes_leitura:
+        if GERAR_CONSOLIDADO:
+            df = ler_csv_completo(caminho_do_arquivo)
+        else:
+            df = ler_csv_metas(caminho_do_arquivo, colunas_usadas)
+        detalhes_leitura['linhas'] = len(df)
+    return df
+
+def processar_arquivo_individual(args: Tuple[str, int, int, tuple],
+                                 leitura_antecipada: Optional[concurrent.futures.Future] = None) -> Tuple[Optional[tuple], Optional[Dict], int, Optional[str]]:
+    # Devolve (somas, identificação, linhas consolidadas, aviso); as metas são calculadas no processo principal.
+    caminho_do_arquivo, idx, _, colunas_usadas = args
     nome_do_arquivo = os.path.basename(caminho_do_arquivo)
     aviso_processamento = None
-    metas_calculadas: Dict[str, str | float] = {} 
+    usar_binario = cache_binario_ativo()
     
     try:
-        df = pd.read_csv(caminho_do_arquivo, sep=',', encoding='utf-8', on_bad_lines='skip')
+        if usar_binario:
+            resultado_binario = processar_arquivo_binario(caminho_do_arquivo, idx, colunas_usadas)
+            if resultado_binario is not None:
+                return resultado_binario
+
+        if TAMANHO_CHUNK_LINHAS:
+            return processar_arquivo_em_chunks(caminho_do_arquivo, idx, TAMANHO_CHUNK_LINHAS, colunas_usadas)
+
+        if leitura_antecipada is not None:
+            with medir_etapa('espera_leitura', arquivo=nome_do_arquivo):
+                df = leitura_antecipada.result()
+        else:
+            df = ler_arquivo_da_tarefa(args)
 
         if df.empty:
-            return None, None, f"Arquivo {nome_do_arquivo} ({idx}/{total_arquivos}) vazio."
+            return None, None, 0, None
 
-        pid_processo = os.getpid()
-        timestamp_atual = datetime.now().strftime('%Y%m%d_%H%M%S')
-        nome_arquivo_temporario = f"temp_{timestamp_atual}_{pid_processo}_{idx}_{nome_do_arquivo.replace(' ', '_').replace('.csv', '')}.csv"
-        caminho_arquivo_temporario = os.path.join(PASTA_TEMP, nome_arquivo_temporario)
-        
-        df.to_csv(caminho_arquivo_temporario, 
-                  index=False, 
-                  encoding='utf-8', 
-                  sep=';', 
-                  quoting=csv.QUOTE_NONNUMERIC)
+        linhas_consolidadas = escrever_no_consolidado(df, nome_do_arquivo) if GERAR_CONSOLIDADO else 0
+        # O consolidado guarda os nomes originais; o cálculo usa os de COLUNAS_META1.
+        df = aplicar_nomes_do_periodo(df)
 
-        if 'sigla_tribunal' not in df.columns or 'ramo_justica' not in df.columns:
-            return None, caminho_arquivo_temporario, f"Arquivo {nome_do_arquivo} sem coluna 'sigla_tribunal' ou 'ramo_justica'"
+        identificacao = extrair_identificacao(df)
+        if len(identificacao) < 2:
+            return None, identificacao, linhas_consolidadas, None
 
-        tribunal_atual = df['sigla_tribunal'].iloc[0]
-        ramo_justica_atual = df['ramo_justica'].iloc[0]
-        
-        fatores_do_ramo, ramo_mapeado = obter_fatores_por_ramo(ramo_justica_atual, tribunal_atual)
-        fatores_je_padronizados = fatores_metas_por_ramo['Justiça Estadual']
-
-        meta1_final = 'NA'
-        colunas_meta1_obrigatorias = ['julgados_2025', 'casos_novos_2025', 'suspensos_2025']
-        if all(c in df.columns and df[c].notna().any() for c in colunas_meta1_obrigatorias):
-            s_julgados_m1 = df['julgados_2025'].sum()
-            s_casos_novos_m1 = df['casos_novos_2025'].sum()
-            s_suspensos_m1 = df['suspensos_2025'].sum()
-            
-            s_dessobrestados_m1 = 0
-            if 'dessobrestados_2025' in df.columns and df['dessobrestados_2025'].notna().any():
-                s_dessobrestados_m1 = df['dessobrestados_2025'].sum()
-
-            if pd.isna(s_julgados_m1):
-                 meta1_final = 'NA'
-            else:
-                den_m1 = s_casos_novos_m1 + s_dessobrestados_m1 - s_suspensos_m1
-                if den_m1 == 0:
-                    meta1_final = 'NA'
-                else:
-                    meta1_final = round((s_julgados_m1 / den_m1) * 100, 2)
-        metas_calculadas['meta1'] = meta1_final
-
-        configuracoes_outras_metas = {
-            'meta2a': ('julgm2_a', 'distm2_a', 'suspm2_a', '2a'),
-            'meta2b': ('julgm2_b', 'distm2_b', 'suspm2_b', '2b'),
-            'meta2c': ('julgm2_c', 'distm2_c', 'suspm2_c', '2c'),
-            'meta2ant': ('julgm2_ant', 'distm2_ant', 'suspm2_ant', '2ant'),
-            'meta4a': ('julgm4_a', 'distm4_a', 'suspm4_a', '4a'),
-            'meta4b': ('julgm4_b', 'distm4_b', 'suspm4_b', '4b'),
-            'meta6': ('julgm6_a', 'distm6_a', 'suspm6_a', '6'),
-            'meta7a': ('julgm7_a', 'distm7_a', 'suspm7_a', '7a'),
-            'meta7b': ('julgm7_b', 'distm7_b', 'suspm7_b', '7b'),
-            'meta8a': ('julgm8_a', 'distm8_a', 'suspm8_a', '8a'),
-            'meta8b': ('julgm8_b', 'distm8_b', 'suspm8_b', '8b'),
-            'meta10a': ('julgm10_a', 'distm10_a', 'suspm10_a', '10a'),
-            'meta10b': ('julgm10_b', 'distm10_b', 'suspm10_b', '10b'),
-        }
-
-        for nome_meta_chave, (j_col, d_col, s_col, chave_fator) in configuracoes_outras_metas.items():
-            fator_aplicar = fatores_do_ramo.get(chave_fator, fatores_je_padronizados.get(chave_fator, 'NA'))
-            metas_calculadas[nome_meta_chave] = calcular_meta_geral(df, j_col, d_col, s_col, fator_aplicar)
-
-        if ramo_mapeado == "Superior Tribunal de Justiça":
-            if '8' in fatores_do_ramo:
-                metas_calculadas['meta8_stj'] = calcular_meta_geral(df, 'julgm8', 'dism8', 'suspm8', fatores_do_ramo.get('8'))
-                if metas_calculadas.get('meta8_stj') != 'NA':
-                    metas_calculadas.pop('meta8a', None)
-                    metas_calculadas.pop('meta8b', None)
-            if '10' in fatores_do_ramo:
-                metas_calculadas['meta10_stj'] = calcular_meta_geral(df, 'julgm10', 'dism10', 'suspm10', fatores_do_ramo.get('10'))
-                if metas_calculadas.get('meta10_stj') != 'NA':
-                    metas_calculadas.pop('meta10a', None)
-                    metas_calculadas.pop('meta10b', None)
+        if usar_binario:
+            with medir_etapa('conversao_binaria', arquivo=nome_do_arquivo):
+                salvar_colunas_binarias(periodo_atual.caminho(PASTA_CACHE_BINARIO), caminho_do_arquivo, df)
         
-        linha_resultado_final = {'sigla_tribunal': tribunal_atual, 'ramo_justica': ramo_justica_atual}
-        linha_resultado_final.update(metas_calculadas)
-
-        return linha_resultado_final, caminho_arquivo_temporario, aviso_processamento
+        with medir_etapa('calculo'):
+            somas_colunas, colunas_com_valor = somar_colunas_metas(df)
+            vetores_somas = entregar_somas(idx - 1, somas_colunas, colunas_com_valor)
+        if VERIFICAR_PARIDADE_METAS:
+            tribunal_atual, ramo_justica_atual = identificacao['sigla_tribunal'], identificacao['ramo_justica']
+            linha_vetorizada = calcular_linha_metas(somas_colunas, colunas_com_valor, tribunal_atual, ramo_justica_atual)
+            metas_referencia = calcular_metas_referencia(df, ramo_justica_atual, tribunal_atual)
+            metas_calculadas = {k: v for k, v in linha_vetorizada.items() if k.startswith('meta')}
+            if {k: str(v) for k, v in metas_referencia.items()} != {k: str(v) for k, v in metas_calculadas.items()}:
+                log.error(f"[PARIDADE] {nome_do_arquivo}: vetorizado={metas_calculadas} referência={metas_referencia}")
+                aviso_processamento = f"Divergência entre o cálculo vetorizado e o de referência no arquivo {nome_do_arquivo}"
+
+        return vetores_somas, identificacao, linhas_consolidadas, aviso_processamento
 
     except Exception as e_process:
         log.error(f"[ERRO] Falha no arquivo {nome_do_arquivo}: {e_process}", exc_info=True)
-        return None, None, f"Erro crítico no arquivo {nome_do_arquivo}"
-
-
-if __name__ == '__main__':
-    t0_exec = time.perf_counter()
-    log.info("==== INICIANDO PROCESSAMENTO PARALELO ====")
-
-    if not os.path.exists(PASTA_CSV):
-        log.error(f"Pasta de dados '{PASTA_CSV}' não encontrada.")
-        exit(1)
-
-    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
-    os.makedirs(PASTA_TEMP, exist_ok=True)
-
-    arquivos_csv_para_processar = [f for f in os.listdir(PASTA_CSV) if f.endswith('.csv')]
+        return None, None, 0, f"Erro crítico no arquivo {nome_do_arquivo}"
+
+def indexar_arquivos(executor: concurrent.futures.Executor, caminhos_csv: list[str], periodo: Periodo,
+                     num_workers: int) -> Dict[str, EntradaIndice]:
+    # Pré-varredura: cabeçalho e primeira linha de cada arquivo, em paralelo no mesmo pool, antes de qualquer leitura completa.
+    with medir_etapa('indexacao', arquivos=len(caminhos_csv)):
+        entradas = executor.map(indexar_arquivo, caminhos_csv, itertools.repeat(periodo.ano_colunas),
+                                chunksize=max(1, len(caminhos_csv) // (num_workers * 4)))
+        return {entrada.caminho: entrada for entrada in entradas}
+
+def descrever_problema(entrada: EntradaIndice, idx: int, total_arquivos: int) -> str:
+    nome_do_arquivo = os.path.basename(entrada.caminho)
+    if entrada.problema == 'vazio':
+        return f"Arquivo {nome_do_arquivo} ({idx}/{total_arquivos}) vazio."
+    if entrada.problema == 'sem_identificacao':
+        return f"Arquivo {nome_do_arquivo} sem coluna 'sigla_tribunal' ou 'ramo_justica'"
+    log.error(f"[ERRO] Não foi possível ler o cabeçalho do arquivo {nome_do_arquivo}")
+    return f"Erro crítico no arquivo {nome_do_arquivo}"
+
+def ler_periodo(especificacao: str) -> Tuple[str, str]:
+    rotulo, separador, pasta_csv = especificacao.partition('=')
+    if not separador or not rotulo or not pasta_csv:
+        raise argparse.ArgumentTypeError(f"período '{especificacao}' inválido; use ROTULO=PASTA (ex.: 2024=dados_2024)")
+    return rotulo, pasta_csv
+
+def montar_periodos(periodos_cli: Optional[list[Tuple[str, str]]]) -> list[Periodo]:
+    if not periodos_cli:
+        return [Periodo('', PASTA_CSV, PASTA_RESULTADOS)]
+    periodos = []
+    for indice, (rotulo, pasta_csv) in enumerate(periodos_cli):
+        # O ano das colunas da Meta 1 vem dos quatro primeiros dígitos do rótulo ('2024', '2025-03'...).
+        ano_rotulo = re.match(r'\d{4}', rotulo)
+        periodos.append(Periodo(rotulo, pasta_csv, os.path.join(PASTA_RESULTADOS, rotulo),
+                                ano_rotulo.group() if ano_rotulo else ANO_COLUNAS_META1, indice))
+    return periodos
+
+def ler_argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Cálculo das metas do Judiciário (versão paralela)")
+    parser.add_argument('--workers', type=int, default=None, help="Número de workers (padrão: núcleos - 1)")
+    parser.add_argument('--executor', choices=['processos', 'threads', 'serial', 'distribuido'], default=TIPO_EXECUTOR)
+    parser.add_argument('--coordenador', default=ENDERECO_COORDENADOR,
+                        help="Com --executor distribuido: HOST:PORTA em que o coordenador espera os nós (porta 0 = qualquer livre)")
+    parser.add_argument('--nos-locais', type=int, default=None,
+                        help="Com --executor distribuido: nós iniciados nesta máquina (padrão: --workers; 0 = só nós remotos)")
+    parser.add_argument('--conectar', default=None, metavar='HOST:PORTA',
+                        help=f"Roda esta máquina como nó de trabalho do coordenador em HOST:PORTA, com --workers processos "
+                             f"(chave na variável {VARIAVEL_CHAVE})")
+    parser.add_argument('--inicio-workers', choices=multiprocessing.get_all_start_methods(), default=None,
+                        help="Como os processos dos workers são criados (padrão do sistema: fork no Linux, spawn no Windows/macOS)")
+    parser.add_argument('--sem-grafico', '--no-chart', dest='sem_grafico', action='store_true', default=not GERAR_GRAFICO,
+                        help="Não gera os gráficos (nem importa o matplotlib)")
+    parser.add_argument('--periodo', dest='periodos', action='append', type=ler_periodo, default=None,
+                        help="Processa vários períodos no mesmo pool de workers (repetível): ROTULO=PASTA, "
+                             "com resultados em <PASTA_RESULTADOS>/<ROTULO> e a série histórica em SerieHistoricaMetas.csv")
+    parser.add_argument('--metricas', default=None, help="Grava tempos por etapa, bytes lidos e pico de memória neste JSON")
+    parser.add_argument('--rastreamento', default=None,
+                        help="Grava um evento por arquivo e por etapa: Chrome trace (.json, abre em chrome://tracing) ou JSON lines (.jsonl)")
+    parser.add_argument('--perfil', default=None, help="Pasta onde cada worker grava seu cProfile (perfil_<pid>.prof)")
+    return parser.parse_args()
+
+def executar_periodo(executor: concurrent.futures.Executor, periodo: Periodo, num_workers: int, tipo_executor: str,
+                     totais: dict, gerar_graficos: bool = True) -> Optional[pd.DataFrame]:
+    global somas_compartilhadas
+    from tqdm import tqdm
+    if periodo.rotulo:
+        log.info(f"==== PERÍODO {periodo.rotulo} ({periodo.pasta_csv}, colunas de {periodo.ano_colunas}) ====")
+    ativar_periodo(periodo)
+    os.makedirs(periodo.pasta_resultados, exist_ok=True)
+    arquivo_resumo = periodo.caminho(ARQUIVO_RESUMO)
+
+    arquivos_csv_para_processar = [f for f in os.listdir(periodo.pasta_csv) if f.endswith('.csv')]
     num_total_csv = len(arquivos_csv_para_processar)
+    totais['arquivos'] += num_total_csv
 
-    lista_tarefas = [(os.path.join(PASTA_CSV, nome_arq), i + 1, num_total_csv) for i, nome_arq in enumerate(arquivos_csv_para_processar)]
+    caminhos_csv = [os.path.join(periodo.pasta_csv, nome_arq) for nome_arq in arquivos_csv_para_processar]
 
     resultados_finais = []
-    arquivos_temporarios_gerados = []
+    linhas_consolidado = 0
     avisos_gerais = set()
+    tempos_etapas = totais['tempos_etapas_s']
+    escritor_resumo = EscritorResumoIncremental(arquivo_resumo) if PIPELINE_ASSINCRONO else None
+    df_resumo_agregado = None
+    somas_tribunais: Dict[int, np.ndarray] = {}
 
-    if not lista_tarefas:
+    if not arquivos_csv_para_processar:
         log.warning("Nenhum CSV encontrado para processar.")
     else:
         log.info(f"Serão processados {num_total_csv} arquivos.")
-        num_workers = max(1, os.cpu_count() - 1 if os.cpu_count() else 1)
-        log.info(f"Utilizando {num_workers} workers.")
-        
-        with concurrent.futures.ProcessPoolExecutor(max_workers=num_workers) as executor:
-            map_results = list(tqdm(
-                executor.map(processar_arquivo_individual, lista_tarefas),
-                total=num_total_csv, desc="Lendo CSVs (Paralelo)"))
-
-            for resultado_map in map_results:
-                if resultado_map:
-                    linha_res, path_tmp, aviso_res = resultado_map
-                    if linha_res: resultados_finais.append(linha_res)
-                    if path_tmp: arquivos_temporarios_gerados.append(path_tmp)
-                    if aviso_res: avisos_gerais.add(aviso_res)
-    
-    if arquivos_temporarios_gerados:
-        log.info(f"Concatenando {len(arquivos_temporarios_gerados)} arquivos para o consolidado...")
-        with open(ARQUIVO_CONSOLIDADO, 'wb') as f_out_consolidado:
-            primeiro_arquivo = True
-            for arquivo_temp_path in tqdm(arquivos_temporarios_gerados, desc="Concatenando"):
+
+        indice_arquivos = indexar_arquivos(executor, caminhos_csv, periodo, num_workers)
+        for entrada in indice_arquivos.values():
+            if entrada.ramo_sem_fatores:
+                avisos_gerais.add(f"Arquivo {os.path.basename(entrada.caminho)}: ramo '{entrada.ramo_justica}' sem fatores específicos; "
+                                  f"metas calculadas com os fatores da Justiça Estadual.")
+        caminhos_validos = [caminho for caminho in caminhos_csv if not indice_arquivos[caminho].problema]
+
+        resultados_por_idx = {}
+        arquivos_pendentes = list(enumerate(caminhos_csv, start=1))
+        entradas_cache: Dict[str, dict] = {}
+        # Arquivos do cache não passam pelos workers, então só podem ser pulados se o consolidado não precisar das linhas deles.
+        reaproveitar_cache = USAR_CACHE_METAS and (not GERAR_CONSOLIDADO or FORMATO_CONSOLIDADO == 'parquet')
+        if USAR_CACHE_METAS and not reaproveitar_cache:
+            log.warning("USAR_CACHE_METAS está ligado, mas o cache de metas não é usado com o consolidado CSV: todos os arquivos "
+                        "serão lidos. Use FORMATO_CONSOLIDADO = 'parquet' ou GERAR_CONSOLIDADO = False para aproveitá-lo.")
+        arquivos_removidos = set()
+        arquivo_cache_metas = periodo.caminho(ARQUIVO_CACHE_METAS)
+        if USAR_CACHE_METAS:
+            entradas_cache = carregar_cache_metas(arquivo_cache_metas)
+            arquivos_removidos = {os.path.basename(caminho) for caminho in entradas_cache if caminho not in caminhos_csv}
+            entradas_cache = {caminho: entrada for caminho, entrada in entradas_cache.items() if caminho in caminhos_csv}
+        if reaproveitar_cache:
+            arquivos_pendentes = []
+            for idx_arq, caminho_arq in enumerate(caminhos_csv, start=1):
+                resultado_cache = consultar_cache_metas(entradas_cache, caminho_arq)
+                if resultado_cache is None:
+                    arquivos_pendentes.append((idx_arq, caminho_arq))
+                else:
+                    resultados_por_idx[idx_arq] = resultado_cache
+                    somas_cache = consultar_somas_cache(entradas_cache, caminho_arq)
+                    if somas_cache is not None:
+                        somas_tribunais[idx_arq] = np.array(somas_cache, dtype='float64')
+                    if escritor_resumo is not None:
+                        escritor_resumo.adicionar(resultado_cache[0])
+            log.info(f"Cache de metas: {len(resultados_por_idx)} acertos, {len(arquivos_pendentes)} faltas.")
+
+        # Arquivos recusados na pré-varredura nunca chegam aos workers (nem ao consolidado).
+        for idx_arq, caminho_arq in arquivos_pendentes:
+            if indice_arquivos[caminho_arq].problema:
+                resultados_por_idx[idx_arq] = (None, 0, descrever_problema(indice_arquivos[caminho_arq], idx_arq, num_total_csv))
+                arquivos_removidos.add(os.path.basename(caminho_arq))
+        if len(caminhos_validos) < num_total_csv:
+            log.info(f"Pré-varredura: {num_total_csv - len(caminhos_validos)} arquivos recusados antes da leitura.")
+        arquivos_pendentes = [(idx_arq, caminho_arq) for idx_arq, caminho_arq in arquivos_pendentes
+                              if not indice_arquivos[caminho_arq].problema]
+
+        tarefas_agendadas = planejar_tarefas(arquivos_pendentes, num_total_csv, num_workers, indice_arquivos)
+        faixas_planejadas: Dict[Tuple[str, int], int] = {}
+        for _, tipo, argumentos in tarefas_agendadas:
+            if tipo == 'faixa':
+                faixas_planejadas[argumentos[:2]] = faixas_planejadas.get(argumentos[:2], 0) + 1
+        num_faixas = sum(faixas_planejadas.values())
+        log.info(f"{len(tarefas_agendadas)} tarefas agendadas (maiores primeiro), {num_faixas} delas faixas de bytes.")
+
+        # Nós de outras máquinas não enxergam a memória compartilhada: as somas voltam no resultado da tarefa.
+        if TRANSPORTE_MEMORIA_COMPARTILHADA and tipo_executor != 'distribuido':
+            num_posicoes_somas = num_total_csv + num_faixas
+            somas_compartilhadas = SomasCompartilhadas(num_posicoes_somas)
+            memoria_somas = (somas_compartilhadas.nome, num_posicoes_somas)
+        else:
+            memoria_somas = None
+
+        faixas_por_arquivo: Dict[Tuple[str, int], list] = {}
+        uso_por_worker: Dict[int, list] = {}
+        deslocamento_compartilhado = None
+        diretorio_consolidado_parquet = periodo.caminho(DIRETORIO_CONSOLIDADO_PARQUET)
+        if GERAR_CONSOLIDADO and FORMATO_CONSOLIDADO == 'parquet':
+            if reaproveitar_cache and resultados_por_idx:
+                remover_particoes_parquet(arquivos_removidos | {os.path.basename(caminho_arq) for _, caminho_arq in arquivos_pendentes})
+            else:
+                shutil.rmtree(diretorio_consolidado_parquet, ignore_errors=True)
+            os.makedirs(diretorio_consolidado_parquet, exist_ok=True)
+        elif GERAR_CONSOLIDADO and deslocamentos_consolidado is not None:
+            tamanho_cabecalho = preparar_consolidado(caminhos_validos)
+            if tamanho_cabecalho is not None:
+                deslocamento_compartilhado = deslocamentos_consolidado[periodo.indice]
+                deslocamento_compartilhado[:] = [tamanho_cabecalho, 0]
+        contexto_periodo = (periodo, memoria_somas, deslocamento_compartilhado is not None)
+
+        t0_paralelo = time.perf_counter()
+        futuros = {executor.submit(executar_tarefa, tipo, argumentos, contexto_periodo): (tamanho, tipo, argumentos)
+                   for tamanho, tipo, argumentos in tarefas_agendadas}
+
+        with tqdm(total=sum(t[0] for t in tarefas_agendadas), unit='B', unit_scale=True,
+                  desc="Lendo CSVs (Paralelo)") as barra_progresso:
+            for futuro in concurrent.futures.as_completed(futuros):
+                tamanho, tipo, argumentos = futuros[futuro]
+                barra_progresso.update(tamanho)
                 try:
-                    with open(arquivo_temp_path, 'rb') as f_in_temp:
-                        if primeiro_arquivo:
-                            f_out_consolidado.write(f_in_temp.read())
-                            primeiro_arquivo = False
-                        else:
-                            next(f_in_temp) 
-                            for linha_bytes in f_in_temp:
-                                f_out_consolidado.write(linha_bytes)
-                    os.remove(arquivo_temp_path)
-                except Exception as e_concat:
-                    log.error(f"Erro ao concatenar ou remover arquivo temporário {arquivo_temp_path}: {e_concat}")
-        log.info(f"Consolidado salvo: {ARQUIVO_CONSOLIDADO}")
-    else:
-        log.warning("Nenhum arquivo temporário para consolidar.")
+                    pid_worker, tempo_tarefa, resultados_tarefa, instrumentacao_tarefa = futuro.result()
+                except Exception as e_tarefa:
+                    log.error(f"[ERRO] Tarefa {tipo} falhou: {e_tarefa}")
+                    if tipo == 'faixa':
+                        faixas_por_arquivo.setdefault(argumentos[:2], []).append((argumentos[2], argumentos[5], None))
+                        continue
+                    # Cada arquivo do lote entra nos avisos como erro crítico, igual a uma falha dentro do worker.
+                    for caminho_arq, idx_arq, *_ in argumentos:
+                        resultados_por_idx[idx_arq] = (None, 0, f"Erro crítico no arquivo {os.path.basename(caminho_arq)} "
+                                                                f"(tarefa perdida no executor: {e_tarefa})")
+                    continue
+
+                totais['bytes_lidos'] += tamanho
+                somar_tempos_etapas(tempos_etapas, instrumentacao_tarefa['tempos'])
+                totais['eventos'].extend(instrumentacao_tarefa['eventos'])
+                if tipo_executor != 'serial':
+                    # Do fim da tarefa no worker até o resultado chegar aqui: serialização, fila e espera do laço principal.
+                    atraso_transferencia = max(0.0, time.time() - instrumentacao_tarefa['fim'])
+                    somar_tempos_etapas(tempos_etapas, {'transferencia': atraso_transferencia})
+                    registrar_evento('transferencia', 'etapa', instrumentacao_tarefa['fim'], atraso_transferencia,
+                                     {'tipo': tipo, 'bytes': tamanho, 'pid_worker': pid_worker})
+                uso = uso_por_worker.setdefault(pid_worker, [0, 0, 0.0])
+                uso[0] += 1
+                uso[1] += tamanho
+                uso[2] += tempo_tarefa
+
+                if tipo == 'faixa':
+                    caminho_arq, idx_arq, num_faixa = argumentos[:3]
+                    faixas_por_arquivo.setdefault((caminho_arq, idx_arq), []).append((num_faixa, argumentos[5], resultados_tarefa[0]))
+                    continue
+                for (caminho_arq, idx_arq, *_), (vetores_somas, *resultado_worker) in zip(argumentos, resultados_tarefa):
+                    resultados_por_idx[idx_arq] = montar_resultado_por_somas(os.path.basename(caminho_arq), idx_arq, num_total_csv,
+                                                                             [idx_arq - 1], [vetores_somas], *resultado_worker,
+                                                                             somas_tribunais=somas_tribunais)
+                    if escritor_resumo is not None:
+                        escritor_resumo.adicionar(resultados_por_idx[idx_arq][0])
+
+        for (caminho_arq, idx_arq), num_faixas_arquivo in faixas_planejadas.items():
+            resultados_faixas = sorted(faixas_por_arquivo.get((caminho_arq, idx_arq), []), key=lambda item: item[0])
+            resultados_por_idx[idx_arq] = combinar_faixas(caminho_arq, idx_arq, num_total_csv,
+                                                          [(posicao, r) for _, posicao, r in resultados_faixas], num_faixas_arquivo,
+                                                          somas_tribunais)
+            if escritor_resumo is not None:
+                escritor_resumo.adicionar(resultados_por_idx[idx_arq][0])
+        if somas_compartilhadas is not None:
+            somas_compartilhadas.fechar()
+            somas_compartilhadas = None
+
+        tempo_paralelo = time.perf_counter() - t0_paralelo
+        totais['tempo_paralelo_s'] += tempo_paralelo
+        registrar_utilizacao_workers(uso_por_worker, tempo_paralelo, num_workers)
+
+        if reaproveitar_cache:
+            for idx_arq, caminho_arq in arquivos_pendentes:
+                if idx_arq in resultados_por_idx:
+                    somas_arquivo = somas_tribunais.get(idx_arq)
+                    registrar_no_cache(entradas_cache, caminho_arq, resultados_por_idx[idx_arq],
+                                       None if somas_arquivo is None else somas_arquivo.tolist())
+            salvar_cache_metas(entradas_cache, arquivo_cache_metas)
+
+        for idx_arq in sorted(resultados_por_idx):
+            linha_res, linhas_res, aviso_res = resultados_por_idx[idx_arq]
+            if linha_res: resultados_finais.append(linha_res)
+            linhas_consolidado += linhas_res
+            if aviso_res: avisos_gerais.add(aviso_res)
+        totais['linhas_consolidadas'] += linhas_consolidado
+
+        if deslocamento_compartilhado is not None:
+            bytes_faltando = deslocamento_compartilhado[0] - tamanho_cabecalho - deslocamento_compartilhado[1]
+            if bytes_faltando:
+                avisos_gerais.add(invalidar_consolidado(periodo, bytes_faltando))
+            else:
+                log.info(f"Consolidado salvo: {periodo.caminho(ARQUIVO_CONSOLIDADO)} ({deslocamento_compartilhado[0] / 1024 / 1024:.1f} MB)")
+        elif GERAR_CONSOLIDADO and FORMATO_CONSOLIDADO == 'parquet' and linhas_consolidado:
+            log.info(f"Consolidado Parquet salvo: {diretorio_consolidado_parquet} ({linhas_consolidado} linhas)")
+    
+    if GERAR_CONSOLIDADO and not linhas_consolidado:
+        log.warning("Nenhum dado para consolidar.")
 
     if resultados_finais:
-        df_resumo_agregado = pd.DataFrame(resultados_finais)
-        df_resumo_agregado = df_resumo_agregado.astype(str).replace('nan', 'NA')
-        
-        cols_principais = ['sigla_tribunal', 'ramo_justica', 'meta1']
-        cols_metas_num = sorted([c for c in df_resumo_agregado.columns if c.startswith('meta') and c != 'meta1' and not c.endswith('_stj')])
-        cols_metas_stj_list = sorted([c for c in df_resumo_agregado.columns if c.endswith('_stj')])
-        
-        ordem_colunas_resumo = cols_principais + cols_metas_num + cols_metas_stj_list
-        outras_cols_resumo = sorted([c for c in df_resumo_agregado.columns if c not in ordem_colunas_resumo])
-        ordem_colunas_resumo.extend(outras_cols_resumo)
-        
-        df_resumo_agregado = df_resumo_agregado[ordem_colunas_resumo]
-        df_resumo_agregado.to_csv(ARQUIVO_RESUMO, index=False, encoding='utf-8', sep=';')
-        log.info(f"Resumo salvo em: {ARQUIVO_RESUMO}")
+        with medir_etapa('resumo'):
+            df_resumo_agregado = montar_resumo(resultados_finais)
+            if escritor_resumo is not None:
+                escritor_resumo.finalizar(df_resumo_agregado)
+            else:
+                salvar_resumo_csv(df_resumo_agregado, arquivo_resumo)
+            log.info(f"Resumo salvo em: {arquivo_resumo}")
+
+            if GERAR_RESUMO_PARQUET:
+                # As metas já são float64 (NaN onde o CSV mostra 'NA'), então vão direto para o Parquet.
+                df_resumo_agregado.to_parquet(periodo.caminho(ARQUIVO_RESUMO_PARQUET), index=False)
+                log.info(f"Resumo Parquet salvo em: {periodo.caminho(ARQUIVO_RESUMO_PARQUET)}")
         
-        if 'meta1' in df_resumo_agregado.columns:
-            gerar_grafico(df_resumo_agregado, 'meta1', GRAFICO_META1)
+        if GERAR_AGREGACOES and somas_tribunais:
+            with medir_etapa('agregacao'):
+                salvar_agregacoes(periodo, [(resultados_por_idx[idx_arq][0]['sigla_tribunal'], resultados_por_idx[idx_arq][0]['ramo_justica'],
+                                             somas_tribunais[idx_arq]) for idx_arq in sorted(somas_tribunais)])
+
+        if gerar_graficos:
+            with medir_etapa('grafico'):
+                gerar_graficos_metas(executor, tipo_executor, df_resumo_agregado, periodo, num_workers)
     else:
+        if escritor_resumo is not None:
+            escritor_resumo.finalizar(None)
         log.warning("Nenhum resultado para gerar resumo.")
 
     if avisos_gerais:
@@ -283,12 +812,123 @@ if __name__ == '__main__':
             log.warning(aviso_item)
         log.warning("==========================================")
 
-    try:
-        if os.path.exists(PASTA_TEMP):
-            shutil.rmtree(PASTA_TEMP)
-            log.info(f"Pasta temporária {PASTA_TEMP} removida.")
-    except Exception as e_rm_temp:
-        log.warning(f"Falha ao remover pasta temporária {PASTA_TEMP}: {e_rm_temp}")
+    return df_resumo_agregado
+
+def salvar_agregacoes(periodo: Periodo, linhas_somas: list[tuple]):
+    # Tudo a partir das somas por tribunal: nenhuma linha dos CSVs é relida. agregar_metas.py refaz qualquer agrupamento depois.
+    df_somas = montar_tabela_somas(linhas_somas)
+    salvar_tabela_somas(df_somas, periodo.caminho(ARQUIVO_SOMAS_TRIBUNAIS))
+    salvar_agregacao(agregar_por_ramo(df_somas), periodo.caminho(ARQUIVO_METAS_POR_RAMO), 'ramo_justica')
+    salvar_agregacao(agregar_nacional(df_somas), periodo.caminho(ARQUIVO_METAS_NACIONAL), 'abrangencia')
+    if ARQUIVO_GRUPOS_TRIBUNAIS:
+        grupo_por_sigla = carregar_mapeamento_grupos(ARQUIVO_GRUPOS_TRIBUNAIS)
+        sem_grupo = tribunais_sem_grupo(df_somas, grupo_por_sigla)
+        if sem_grupo:
+            log.warning(f"Tribunais fora de {ARQUIVO_GRUPOS_TRIBUNAIS}: {', '.join(sem_grupo)}")
+        salvar_agregacao(agregar_por_mapeamento(df_somas, grupo_por_sigla), periodo.caminho(ARQUIVO_METAS_POR_GRUPO))
+    log.info(f"Somas por tribunal e agregações (ramo, nacional) salvas em: {periodo.pasta_resultados}")
+
+def salvar_serie_historica(resumos_por_periodo: Dict[str, pd.DataFrame], caminho: str):
+    # Formato longo: uma linha por período e tribunal, com as mesmas colunas de metas dos resumos.
+    df_serie = pd.concat([df_resumo.assign(periodo=rotulo) for rotulo, df_resumo in resumos_por_periodo.items()],
+                         ignore_index=True)
+    df_serie = df_serie[['periodo'] + [c for c in COLUNAS_RESUMO if c in df_serie.columns]]
+    salvar_resumo_csv(df_serie, caminho)
+    log.info(f"Série histórica salva em: {caminho} ({len(resumos_por_periodo)} períodos, {len(df_serie)} linhas)")
+
+
+if __name__ == '__main__':
+    configurar_log()
+    argumentos_cli = ler_argumentos()
+    chave_distribuida = os.environ[VARIAVEL_CHAVE].encode() if os.environ.get(VARIAVEL_CHAVE) else None
+    if argumentos_cli.conectar:
+        if chave_distribuida is None:
+            log.error(f"Defina a chave compartilhada com o coordenador na variável {VARIAVEL_CHAVE}.")
+            exit(1)
+        # Cada processo é um nó: conecta, recebe as tarefas e termina quando o coordenador encerra.
+        nos = iniciar_nos(ler_endereco(argumentos_cli.conectar), chave_distribuida, argumentos_cli.workers or os.cpu_count() or 1,
+                          multiprocessing.get_context(argumentos_cli.inicio_workers))
+        log.info(f"{len(nos)} nós conectando a {argumentos_cli.conectar}.")
+        for no in nos:
+            no.join()
+        exit(0)
+    if argumentos_cli.perfil and argumentos_cli.executor == 'threads':
+        # O cProfile só observa a thread que o ativou; com threads, os perfis sairiam incompletos.
+        log.warning("--perfil não é suportado com o executor de threads; ignorando.")
+        argumentos_cli.perfil = None
+    configurar_instrumentacao(bool(argumentos_cli.rastreamento), argumentos_cli.perfil)
+    t0_exec = time.perf_counter()
+    registrar_etapa('importacao', time.time() - (t0_exec - T0_IMPORTACAO), t0_exec - T0_IMPORTACAO)
+    log.info("==== INICIANDO PROCESSAMENTO PARALELO ====")
+
+    periodos = montar_periodos(argumentos_cli.periodos)
+    for periodo in periodos:
+        if not os.path.exists(periodo.pasta_csv):
+            log.error(f"Pasta de dados '{periodo.pasta_csv}' não encontrada.")
+            exit(1)
+
+    if (FORMATO_CONSOLIDADO == 'parquet' or GERAR_RESUMO_PARQUET) and MOTOR_LEITURA_CSV != 'pyarrow':
+        log.error("Saída em Parquet requer o pacote 'pyarrow'.")
+        exit(1)
+
+    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+
+    num_workers = argumentos_cli.workers or max(1, os.cpu_count() - 1 if os.cpu_count() else 1)
+    log.info(f"Utilizando {num_workers} workers (executor: {argumentos_cli.executor}).")
+    totais = {'arquivos': 0, 'bytes_lidos': 0, 'linhas_consolidadas': 0, 'tempo_paralelo_s': 0.0,
+              'tempos_etapas_s': {}, 'eventos': []}
+    deslocamentos_compartilhados = None
+    opcoes_executor = {}
+    if argumentos_cli.executor == 'distribuido':
+        opcoes_executor = {'endereco': ler_endereco(argumentos_cli.coordenador), 'chave': chave_distribuida,
+                           'nos_locais': argumentos_cli.nos_locais, 'max_tentativas': MAX_TENTATIVAS_TAREFA}
+        if GERAR_CONSOLIDADO and FORMATO_CONSOLIDADO != 'parquet':
+            # O contador de deslocamento só existe numa máquina; em pasta compartilhada, o consolidado Parquet funciona.
+            log.warning("Consolidado CSV não é gerado com o executor distribuído; use FORMATO_CONSOLIDADO = 'parquet'.")
+    elif GERAR_CONSOLIDADO and FORMATO_CONSOLIDADO != 'parquet':
+        # Do mesmo contexto (fork/spawn) do pool, senão o lock do contador não pode ser passado aos workers.
+        contexto_mp = multiprocessing.get_context(argumentos_cli.inicio_workers if argumentos_cli.executor == 'processos' else None)
+        # Por período: o próximo deslocamento livre e os bytes já gravados.
+        deslocamentos_compartilhados = [contexto_mp.Array('q', 2) for _ in periodos]
+    deslocamentos_consolidado = deslocamentos_compartilhados
+
+    if TRANSPORTE_MEMORIA_COMPARTILHADA and argumentos_cli.executor == 'processos':
+        preparar_rastreador_memoria()
+
+    resumos_por_periodo: Dict[str, pd.DataFrame] = {}
+    # Um só pool para todos os períodos: os workers sobem (e importam pandas) uma vez só.
+    with criar_executor(argumentos_cli.executor, num_workers, initializer=inicializar_worker,
+                        initargs=(deslocamentos_compartilhados, bool(argumentos_cli.rastreamento), argumentos_cli.perfil, time.time()),
+                        metodo_inicio=argumentos_cli.inicio_workers, **opcoes_executor) as executor:
+        for periodo in periodos:
+            df_resumo_periodo = executar_periodo(executor, periodo, num_workers, argumentos_cli.executor, totais,
+                                                 gerar_graficos=not argumentos_cli.sem_grafico)
+            if df_resumo_periodo is not None:
+                resumos_por_periodo[periodo.rotulo] = df_resumo_periodo
+
+    if argumentos_cli.periodos and resumos_por_periodo:
+        salvar_serie_historica(resumos_por_periodo, ARQUIVO_SERIE_HISTORICA)
 
     tempo_total_exec = time.perf_counter() - t0_exec
-    log.info(f"Processamento paralelo concluído em {tempo_total_exec:.2f} segundos.")
\ No newline at end of file
+    log.info(f"Processamento paralelo concluído em {tempo_total_exec:.2f} segundos.")
+
+    tempos_etapas = totais['tempos_etapas_s']
+    eventos_rastreamento = totais['eventos']
+    instrumentacao_principal = coletar_instrumentacao()
+    somar_tempos_etapas(tempos_etapas, instrumentacao_principal['tempos'])
+    eventos_rastreamento.extend(instrumentacao_principal['eventos'])
+    if argumentos_cli.rastreamento:
+        salvar_rastreamento(argumentos_cli.rastreamento, eventos_rastreamento, os.getpid())
+        log.info(f"Rastreamento salvo em: {argumentos_cli.rastreamento} ({len(eventos_rastreamento)} eventos)")
+    if argumentos_cli.perfil:
+        log.info(f"Perfis cProfile salvos em: {argumentos_cli.perfil} (ex.: python -m pstats {argumentos_cli.perfil}/perfil_<pid>.prof)")
+
+    if argumentos_cli.metricas:
+        # Etapas dos workers somam o tempo ocupado de todos eles; as do processo principal são tempo de parede.
+        salvar_metricas(argumentos_cli.metricas, {
+            'versao': 'P', 'executor': argumentos_cli.executor, 'inicio_workers': argumentos_cli.inicio_workers or multiprocessing.get_start_method(),
+            'num_workers': num_workers,
+            'periodos': [periodo.rotulo for periodo in periodos if periodo.rotulo],
+            'arquivos': totais['arquivos'], 'bytes_lidos': totais['bytes_lidos'], 'linhas_consolidadas': totais['linhas_consolidadas'],
+            'tempo_total_s': tempo_total_exec, 'tempo_paralelo_s': totais['tempo_paralelo_s'],
+            'tempos_etapas_s': tempos_etapas, 'pico_memoria_mb': medir_pico_memoria_mb()})
@@ -0,0 +1,48 @@
+import os
+import argparse
+import logging
+
+from rich.logging import RichHandler
+
+from metas_judiciarias.agregacao import (agregar_nacional, agregar_por_mapeamento, agregar_por_ramo, carregar_mapeamento_grupos,
+                                         carregar_tabela_somas, salvar_agregacao, tribunais_sem_grupo)
+
+logging.basicConfig(level="INFO", format="[%(asctime)s] %(levelname)s: %(message)s", datefmt="%H:%M:%S", handlers=[RichHandler()])
+log = logging.getLogger("rich")
+
+ARQUIVO_SOMAS_PADRAO = os.path.join('resultados_versao_P', 'SomasTribunais.csv')
+
+def ler_argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Metas agregadas (por ramo, nacional ou por grupo de tribunais) a partir de SomasTribunais.csv, "
+                                                 "sem reler os dados")
+    parser.add_argument('somas', nargs='?', default=ARQUIVO_SOMAS_PADRAO, help=f"Tabela de somas por tribunal (padrão: {ARQUIVO_SOMAS_PADRAO})")
+    parser.add_argument('--grupos', default=None, help="CSV com as colunas sigla_tribunal e grupo (ex.: regiões)")
+    parser.add_argument('--saida', default=None, help="Pasta dos CSVs gerados (padrão: a pasta da tabela de somas)")
+    return parser.parse_args()
+
+def main():
+    argumentos_cli = ler_argumentos()
+    if not os.path.exists(argumentos_cli.somas):
+        log.error(f"Tabela de somas '{argumentos_cli.somas}' não encontrada; rode Versao_P.py com GERAR_AGREGACOES = True.")
+        exit(1)
+    pasta_saida = argumentos_cli.saida or os.path.dirname(argumentos_cli.somas) or '.'
+    os.makedirs(pasta_saida, exist_ok=True)
+
+    df_somas = carregar_tabela_somas(argumentos_cli.somas)
+    log.info(f"{len(df_somas)} tribunais em {argumentos_cli.somas}")
+    agregacoes = [(agregar_por_ramo(df_somas), 'ResumoMetasPorRamo.csv', 'ramo_justica'),
+                  (agregar_nacional(df_somas), 'ResumoMetasNacional.csv', 'abrangencia')]
+    if argumentos_cli.grupos:
+        grupo_por_sigla = carregar_mapeamento_grupos(argumentos_cli.grupos)
+        sem_grupo = tribunais_sem_grupo(df_somas, grupo_por_sigla)
+        if sem_grupo:
+            log.warning(f"Tribunais fora de {argumentos_cli.grupos}: {', '.join(sem_grupo)}")
+        agregacoes.append((agregar_por_mapeamento(df_somas, grupo_por_sigla), 'ResumoMetasPorGrupo.csv', None))
+
+    for df_grupos, nome_arquivo, coluna_grupo in agregacoes:
+        caminho_saida = os.path.join(pasta_saida, nome_arquivo)
+        salvar_agregacao(df_grupos, caminho_saida, coluna_grupo)
+        log.info(f"{len(df_grupos)} grupos salvos em: {caminho_saida}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,221 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import statistics
+import subprocess
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+from rich.logging import RichHandler
+
+from metas_judiciarias import COLUNAS_META1, configuracoes_metas_stj, configuracoes_outras_metas
+from metas_judiciarias.metricas import ETAPAS
+
+logging.basicConfig(level="INFO", format="[%(asctime)s] %(levelname)s: %(message)s", datefmt="%H:%M:%S", handlers=[RichHandler()])
+log = logging.getLogger("rich")
+
+PASTA_BENCHMARK = 'benchmark_sintetico'
+PASTA_RESULTADOS_BENCHMARK = 'resultados_benchmark'
+PASTA_SCRIPTS = os.path.dirname(os.path.abspath(__file__))
+SCRIPTS_PIPELINES = {'NP': 'Versao_Np.py', 'P': 'Versao_P.py'}
+PASTAS_RESULTADOS_PIPELINES = {'NP': 'resultados_versao_NP', 'P': 'resultados_versao_P'}
+TOLERANCIA_REGRESSAO = 0.15
+PROPORCAO_VALORES_AUSENTES = 0.03
+
+# (sigla, ramo, peso): poucos TJs enormes, TRTs/TRFs médios e muitos TREs pequenos, como nos dados reais.
+TRIBUNAIS_SINTETICOS = (
+    [('TJSP', 'Justiça Estadual', 40.0), ('TJMG', 'Justiça Estadual', 12.0), ('TJRJ', 'Justiça Estadual', 12.0),
+     ('TJRS', 'Justiça Estadual', 8.0), ('TJPR', 'Justiça Estadual', 6.0), ('TJBA', 'Justiça Estadual', 4.0),
+     ('TJSC', 'Justiça Estadual', 3.0), ('TJGO', 'Justiça Estadual', 2.0), ('TJPE', 'Justiça Estadual', 2.0),
+     ('TJAC', 'Justiça Estadual', 0.5), ('TJRR', 'Justiça Estadual', 0.5)]
+    + [(f'TRF{n}', 'Justiça Federal', 2.0) for n in range(1, 7)]
+    + [(f'TRT{n}', 'Justiça do Trabalho', 1.0) for n in range(1, 25)]
+    + [(f'TRE-{uf}', 'Justiça Eleitoral', 0.05) for uf in ('AC', 'AL', 'AM', 'AP', 'BA', 'CE', 'DF', 'ES', 'GO', 'MA', 'MG', 'MS', 'MT',
+                                                             'PA', 'PB', 'PE', 'PI', 'PR', 'RJ', 'RN', 'RO', 'RR', 'RS', 'SC', 'SE', 'SP', 'TO')]
+    + [('TJMSP', 'Justiça Militar Estadual', 0.1), ('TJMMG', 'Justiça Militar Estadual', 0.1),
+       ('STM', 'Justiça Militar da União', 0.1), ('TST', 'Tribunais Superiores', 1.0), ('STJ', 'Tribunais Superiores', 1.5)]
+)
+
+def listar_colunas_sinteticas(sigla_tribunal: str) -> list[str]:
+    colunas = ['sigla_tribunal', 'procedimento', 'ramo_justica', 'sigla_grau', 'orgao_julgador', 'municipio'] + list(COLUNAS_META1)
+    configuracoes = [configuracoes_outras_metas] + ([configuracoes_metas_stj] if sigla_tribunal == 'STJ' else [])
+    for configuracao in configuracoes:
+        for j_col, d_col, s_col, _ in configuracao.values():
+            colunas.extend((j_col, d_col, s_col))
+    return colunas
+
+def gerar_csv_sintetico(caminho: str, sigla_tribunal: str, ramo_justica: str, num_linhas: int, gerador: np.random.Generator):
+    colunas = listar_colunas_sinteticas(sigla_tribunal)
+    dados = {'sigla_tribunal': np.full(num_linhas, sigla_tribunal),
+             'procedimento': gerador.choice(['Conhecimento', 'Execução', 'Recursal'], num_linhas),
+             'ramo_justica': np.full(num_linhas, ramo_justica),
+             'sigla_grau': gerador.choice(['G1', 'G2', 'JE', 'TR'], num_linhas),
+             'orgao_julgador': [f"Vara {n} de {sigla_tribunal}" for n in gerador.integers(1, 400, num_linhas)],
+             'municipio': gerador.choice(['CAPITAL', 'INTERIOR', 'REGIAO METROPOLITANA'], num_linhas)}
+    for col in colunas[6:]:
+        # Distribuídos maiores que julgados e suspensos pequenos, para que as metas fiquem em faixas realistas.
+        escala = 60 if col.startswith(('casos_novos', 'dist', 'dism')) else 5 if col.startswith(('susp', 'dessobrestados')) else 45
+        valores = gerador.poisson(escala, num_linhas).astype('float64')
+        valores[gerador.random(num_linhas) < PROPORCAO_VALORES_AUSENTES] = np.nan
+        dados[col] = valores
+    pd.DataFrame(dados, columns=colunas).to_csv(caminho, index=False, encoding='utf-8', float_format='%.0f')
+
+def gerar_dados_sinteticos(pasta_dados: str, total_linhas: int, semente: int) -> dict:
+    manifesto_path = os.path.join(pasta_dados, 'manifesto.json')
+    parametros = {'total_linhas': total_linhas, 'semente': semente, 'tribunais': len(TRIBUNAIS_SINTETICOS)}
+    try:
+        with open(manifesto_path, encoding='utf-8') as f_manifesto:
+            manifesto = json.load(f_manifesto)
+        if manifesto['parametros'] == parametros:
+            log.info(f"Reaproveitando dados sintéticos em {pasta_dados}.")
+            return manifesto
+    except (OSError, ValueError, KeyError):
+        pass
+
+    shutil.rmtree(pasta_dados, ignore_errors=True)
+    os.makedirs(pasta_dados)
+    gerador = np.random.default_rng(semente)
+    peso_total = sum(peso for *_, peso in TRIBUNAIS_SINTETICOS)
+    arquivos = {}
+    for sigla_tribunal, ramo_justica, peso in TRIBUNAIS_SINTETICOS:
+        num_linhas = max(10, int(total_linhas * peso / peso_total))
+        caminho = os.path.join(pasta_dados, f'teste_{sigla_tribunal}.csv')
+        gerar_csv_sintetico(caminho, sigla_tribunal, ramo_justica, num_linhas, gerador)
+        arquivos[os.path.basename(caminho)] = {'linhas': num_linhas, 'bytes': os.path.getsize(caminho)}
+
+    manifesto = {'parametros': parametros, 'arquivos': arquivos,
+                 'bytes_total': sum(a['bytes'] for a in arquivos.values())}
+    with open(manifesto_path, 'w', encoding='utf-8') as f_manifesto:
+        json.dump(manifesto, f_manifesto, ensure_ascii=False, indent=2)
+    log.info(f"{len(arquivos)} CSVs sintéticos gerados em {pasta_dados} ({manifesto['bytes_total'] / 1024 / 1024:.1f} MB).")
+    return manifesto
+
+def executar_pipeline(versao: str, pasta_trabalho: str, num_workers: Optional[int], executor: Optional[str],
+                      sem_grafico: bool = False) -> Optional[dict]:
+    shutil.rmtree(os.path.join(pasta_trabalho, PASTAS_RESULTADOS_PIPELINES[versao]), ignore_errors=True)
+    caminho_metricas = os.path.join(pasta_trabalho, f'metricas_{versao}.json')
+    comando = [sys.executable, os.path.join(PASTA_SCRIPTS, SCRIPTS_PIPELINES[versao]), '--metricas', caminho_metricas]
+    if sem_grafico:
+        comando.append('--sem-grafico')
+    if versao == 'P':
+        comando += ['--workers', str(num_workers), '--executor', executor]
+
+    t0_execucao = time.perf_counter()
+    processo = subprocess.run(comando, cwd=pasta_trabalho, capture_output=True, text=True)
+    tempo_parede = time.perf_counter() - t0_execucao
+    if processo.returncode != 0:
+        log.error(f"[ERRO] {versao} ({executor}, {num_workers} workers) terminou com código {processo.returncode}:\n{processo.stderr[-2000:]}")
+        return None
+
+    with open(caminho_metricas, encoding='utf-8') as f_metricas:
+        metricas = json.load(f_metricas)
+    metricas['tempo_parede_s'] = tempo_parede
+    return metricas
+
+def resumir_execucoes(execucoes: list[dict]) -> list[dict]:
+    grupos: Dict[tuple, list] = {}
+    for execucao in execucoes:
+        grupos.setdefault((execucao['versao'], execucao['executor'], execucao['num_workers']), []).append(execucao)
+
+    tempo_serial = None
+    if ('NP', 'serial', 1) in grupos:
+        tempo_serial = statistics.median(e['tempo_total_s'] for e in grupos[('NP', 'serial', 1)])
+
+    resumo = []
+    for (versao, executor, num_workers), grupo in sorted(grupos.items(), key=lambda item: (item[0][0] != 'NP', item[0][1], item[0][2])):
+        tempo_mediano = statistics.median(e['tempo_total_s'] for e in grupo)
+        etapas = [etapa for etapa in ETAPAS if any(etapa in e['tempos_etapas_s'] for e in grupo)]
+        speedup = tempo_serial / tempo_mediano if tempo_serial and tempo_mediano else None
+        resumo.append({'versao': versao, 'executor': executor, 'num_workers': num_workers, 'repeticoes': len(grupo),
+                       'tempo_mediano_s': tempo_mediano, 'tempo_minimo_s': min(e['tempo_total_s'] for e in grupo),
+                       'tempos_etapas_mediana_s': {etapa: statistics.median(e['tempos_etapas_s'].get(etapa, 0.0) for e in grupo)
+                                                   for etapa in etapas},
+                       'pico_memoria_mb': max((e['pico_memoria_mb']['principal'] or 0) for e in grupo),
+                       'pico_memoria_workers_mb': max((e['pico_memoria_mb']['workers'] or 0) for e in grupo),
+                       'bytes_lidos': grupo[0]['bytes_lidos'],
+                       'speedup': speedup,
+                       'eficiencia': speedup / num_workers if speedup else None})
+    return resumo
+
+def comparar_com_referencia(resumo: list[dict], caminho_referencia: str, tolerancia: float) -> list[str]:
+    with open(caminho_referencia, encoding='utf-8') as f_referencia:
+        resumo_referencia = json.load(f_referencia)['resumo']
+    tempos_referencia = {(r['versao'], r['executor'], r['num_workers']): r['tempo_mediano_s'] for r in resumo_referencia}
+
+    regressoes = []
+    for item in resumo:
+        chave = (item['versao'], item['executor'], item['num_workers'])
+        if chave not in tempos_referencia:
+            continue
+        variacao = item['tempo_mediano_s'] / tempos_referencia[chave] - 1
+        if variacao > tolerancia:
+            regressoes.append(f"{item['versao']} {item['executor']} {item['num_workers']} workers: "
+                              f"{tempos_referencia[chave]:.2f}s -> {item['tempo_mediano_s']:.2f}s (+{variacao:.0%})")
+    return regressoes
+
+def ler_argumentos() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark das versões NP e P com CSVs sintéticos")
+    parser.add_argument('--linhas', type=int, default=500_000, help="Total de linhas distribuído entre os tribunais sintéticos")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="Números de workers testados na versão P")
+    parser.add_argument('--executores', nargs='+', default=['processos'], choices=['processos', 'threads', 'serial'])
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--sem-np', action='store_true', help="Não executa a versão não paralela (sem speedup)")
+    parser.add_argument('--sem-grafico', action='store_true',
+                        help="Executa as duas versões sem gráficos (a P desenha um por meta e por ramo; a NP, só o da Meta 1)")
+    parser.add_argument('--saida', default=None, help="Arquivo JSON de saída (padrão: resultados_benchmark/benchmark_<data>.json)")
+    parser.add_argument('--referencia', default=None, help="JSON de um benchmark anterior para detectar regressões")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA_REGRESSAO)
+    return parser.parse_args()
+
+def main():
+    argumentos_cli = ler_argumentos()
+    pasta_trabalho = os.path.abspath(PASTA_BENCHMARK)
+    manifesto = gerar_dados_sinteticos(os.path.join(pasta_trabalho, 'dados'), argumentos_cli.linhas, argumentos_cli.semente)
+
+    configuracoes = [] if argumentos_cli.sem_np else [('NP', None, None)]
+    configuracoes += [('P', executor, num_workers) for executor in argumentos_cli.executores for num_workers in argumentos_cli.workers]
+
+    execucoes = []
+    for repeticao in range(1, argumentos_cli.repeticoes + 1):
+        for versao, executor, num_workers in configuracoes:
+            metricas = executar_pipeline(versao, pasta_trabalho, num_workers, executor, argumentos_cli.sem_grafico)
+            if metricas is None:
+                continue
+            metricas['repeticao'] = repeticao
+            execucoes.append(metricas)
+            log.info(f"[{repeticao}/{argumentos_cli.repeticoes}] {versao} {metricas['executor']} {metricas['num_workers']} workers: "
+                     f"{metricas['tempo_total_s']:.2f}s")
+
+    resumo = resumir_execucoes(execucoes)
+    for item in resumo:
+        speedup = f"speedup {item['speedup']:.2f}x, eficiência {item['eficiencia']:.0%}" if item['speedup'] else "sem referência serial"
+        log.info(f"{item['versao']} {item['executor']} {item['num_workers']} workers: {item['tempo_mediano_s']:.2f}s ({speedup})")
+
+    resultado = {'gerado_em': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                 'maquina': {'plataforma': platform.platform(), 'python': platform.python_version(),
+                             'processador': platform.processor(), 'nucleos': os.cpu_count()},
+                 'dados': manifesto, 'sem_grafico': argumentos_cli.sem_grafico, 'execucoes': execucoes, 'resumo': resumo}
+
+    caminho_saida = argumentos_cli.saida or os.path.join(PASTA_RESULTADOS_BENCHMARK, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(caminho_saida) or '.', exist_ok=True)
+    with open(caminho_saida, 'w', encoding='utf-8') as f_saida:
+        json.dump(resultado, f_saida, ensure_ascii=False, indent=2)
+    log.info(f"Benchmark salvo em: {caminho_saida}")
+
+    if argumentos_cli.referencia:
+        regressoes = comparar_com_referencia(resumo, argumentos_cli.referencia, argumentos_cli.tolerancia)
+        for regressao in regressoes:
+            log.warning(f"[REGRESSÃO] {regressao}")
+        if regressoes:
+            sys.exit(1)
+        log.info(f"Nenhuma regressão acima de {argumentos_cli.tolerancia:.0%} em relação a {argumentos_cli.referencia}.")
+
+if __name__ == '__main__':
+    main()
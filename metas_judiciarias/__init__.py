@@ -0,0 +1,11 @@
+from .calculo import (acumular_somas, calcular_linha_metas, calcular_linha_metas_por_vetores, calcular_metas_por_somas,
+                      calcular_metas_por_vetores, montar_vetor_somas, somar_colunas_metas)
+from .configuracao import (ANO_COLUNAS_META1, COLUNAS_IDENTIFICACAO, COLUNAS_META1, COLUNAS_NUMERICAS_METAS, PREFIXOS_META1,
+                           configuracoes_metas_stj, configuracoes_outras_metas, fatores_metas_por_ramo, fatores_padrao_je,
+                           mapear_colunas_do_ano, mapear_ramo, obter_fatores_por_ramo)
+from .distribuido import ExecutorDistribuido, executar_no, iniciar_nos, ler_endereco
+from .executores import EXECUTORES, ExecutorSerial, criar_executor
+from .leitura import (MOTOR_LEITURA_CSV, aplicar_nomes_do_periodo, colunas_metas_em_float, definir_ano_colunas,
+                      dividir_em_faixas_de_bytes, ler_csv_completo, ler_csv_em_chunks, ler_csv_metas, ler_faixa_de_bytes, nomes_colunas_do_periodo,
+                      selecionar_colunas_metas, uniformizar_colunas_metas)
+from .resumo import COLUNAS_RESUMO, EscritorResumoIncremental, montar_resumo, ordenar_colunas_resumo, salvar_resumo_csv
@@ -0,0 +1,98 @@
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from .calculo import (DEFINICOES_METAS_VETORIZADAS, FATORES_VETORIZADOS_POR_RAMO, INDICE_DESSOBRESTADOS, INDICES_DISTRIBUIDOS,
+                      INDICES_JULGADOS, INDICES_SUSPENSOS, INICIO_METAS_STJ, NOMES_METAS_VETORIZADAS)
+from .configuracao import COLUNAS_NUMERICAS_METAS, mapear_ramo
+from .resumo import COLUNAS_METAS_RESUMO, salvar_resumo_csv
+
+# Tabela compacta com as somas brutas de cada tribunal (NaN onde a coluna não tem valor): basta para qualquer agrupamento.
+COLUNAS_TABELA_SOMAS = ['sigla_tribunal', 'ramo_justica'] + COLUNAS_NUMERICAS_METAS
+
+def montar_tabela_somas(linhas: list[tuple]) -> pd.DataFrame:
+    # linhas: (sigla, ramo, vetor de somas na ordem de COLUNAS_NUMERICAS_METAS).
+    somas = np.array([vetor for *_, vetor in linhas], dtype='float64').reshape(len(linhas), len(COLUNAS_NUMERICAS_METAS))
+    df_somas = pd.DataFrame(somas, columns=COLUNAS_NUMERICAS_METAS)
+    df_somas.insert(0, 'ramo_justica', [ramo for _, ramo, _ in linhas])
+    df_somas.insert(0, 'sigla_tribunal', [sigla for sigla, _, _ in linhas])
+    return df_somas
+
+def salvar_tabela_somas(df_somas: pd.DataFrame, caminho: str):
+    # Sem na_rep: os vazios voltam como NaN na leitura, e o repr dos floats preserva as somas exatas.
+    df_somas.to_csv(caminho, index=False, encoding='utf-8', sep=';')
+
+def carregar_tabela_somas(caminho: str) -> pd.DataFrame:
+    df_somas = pd.read_csv(caminho, sep=';', encoding='utf-8', dtype={'sigla_tribunal': str, 'ramo_justica': str})
+    return df_somas.reindex(columns=COLUNAS_TABELA_SOMAS)
+
+def contribuicoes_por_tribunal(df_somas: pd.DataFrame):
+    somas = df_somas[COLUNAS_NUMERICAS_METAS].to_numpy(dtype='float64')
+    com_valor = ~np.isnan(somas)
+    # Mesmo mapeamento do cálculo por tribunal (TST/STJ/Eleitoral), com os fatores da JE para ramos desconhecidos.
+    ramos = [mapear_ramo(ramo, sigla) for sigla, ramo in zip(df_somas['sigla_tribunal'], df_somas['ramo_justica'])]
+    fatores = np.array([FATORES_VETORIZADOS_POR_RAMO.get(ramo, FATORES_VETORIZADOS_POR_RAMO['Justiça Estadual']) for ramo in ramos])
+    fatores = fatores.reshape(len(df_somas), len(NOMES_METAS_VETORIZADAS))
+
+    julgados = np.nan_to_num(somas[:, INDICES_JULGADOS])
+    dessobrestados = np.zeros_like(julgados)
+    dessobrestados[:, 0] = np.where(com_valor[:, INDICE_DESSOBRESTADOS], np.nan_to_num(somas[:, INDICE_DESSOBRESTADOS]), 0)
+    denominadores = (np.nan_to_num(somas[:, INDICES_DISTRIBUIDOS]) + dessobrestados - np.nan_to_num(somas[:, INDICES_SUSPENSOS]))
+    contribui = (com_valor[:, INDICES_JULGADOS] & com_valor[:, INDICES_DISTRIBUIDOS] & com_valor[:, INDICES_SUSPENSOS]
+                 & ~np.isnan(fatores))
+
+    # Como no resumo: onde a meta do STJ vale, as variantes 'a'/'b' do mesmo tribunal saem da conta.
+    for posicao in range(INICIO_METAS_STJ, len(NOMES_METAS_VETORIZADAS)):
+        chave_fator = DEFINICOES_METAS_VETORIZADAS[posicao][3]
+        meta_stj_valida = contribui[:, posicao] & (denominadores[:, posicao] != 0)
+        for variante in (f'meta{chave_fator}a', f'meta{chave_fator}b'):
+            if variante in NOMES_METAS_VETORIZADAS:
+                contribui[meta_stj_valida, NOMES_METAS_VETORIZADAS.index(variante)] = False
+    return julgados, denominadores, fatores, contribui
+
+def agregar_metas(df_somas: pd.DataFrame, grupos: pd.Series) -> pd.DataFrame:
+    # Meta do grupo = soma, por fator, de (julgados / denominador total) * fator: os julgados de cada tribunal levam o fator
+    # do seu ramo, e um grupo de um só ramo dá exatamente a fórmula do tribunal aplicada às somas do grupo.
+    julgados, denominadores, fatores, contribui = contribuicoes_por_tribunal(df_somas)
+    grupos = grupos.reset_index(drop=True)
+    linhas = []
+    for nome_grupo, posicoes in grupos.groupby(grupos, sort=True).groups.items():
+        posicoes = np.asarray(posicoes)
+        linha = {'grupo': nome_grupo, 'tribunais': len(posicoes)}
+        for num_meta, nome_meta in enumerate(NOMES_METAS_VETORIZADAS):
+            mascara = contribui[posicoes, num_meta]
+            denominador = denominadores[posicoes, num_meta][mascara].sum()
+            if not mascara.any() or denominador == 0:
+                continue
+            julgados_meta, fatores_meta = julgados[posicoes, num_meta][mascara], fatores[posicoes, num_meta][mascara]
+            linha[nome_meta] = round(sum((julgados_meta[fatores_meta == fator].sum() / denominador) * fator
+                                         for fator in np.unique(fatores_meta)), 2)
+        linhas.append(linha)
+
+    df_grupos = pd.DataFrame(linhas, columns=['grupo', 'tribunais'] + COLUNAS_METAS_RESUMO)
+    # Metas que nenhum grupo tem (ex.: as do STJ sem o STJ) não viram colunas vazias.
+    return df_grupos.dropna(axis=1, how='all').astype({'tribunais': 'int64'})
+
+def agregar_por_ramo(df_somas: pd.DataFrame) -> pd.DataFrame:
+    return agregar_metas(df_somas, df_somas['ramo_justica'])
+
+def agregar_nacional(df_somas: pd.DataFrame, rotulo: str = 'Nacional') -> pd.DataFrame:
+    return agregar_metas(df_somas, pd.Series(rotulo, index=df_somas.index))
+
+def agregar_por_mapeamento(df_somas: pd.DataFrame, grupo_por_sigla: Dict[str, str]) -> pd.DataFrame:
+    # Tribunais fora do mapeamento ficam de fora (grupo NaN é descartado pelo groupby).
+    return agregar_metas(df_somas, df_somas['sigla_tribunal'].map(grupo_por_sigla))
+
+def carregar_mapeamento_grupos(caminho: str) -> Dict[str, str]:
+    # CSV com as colunas sigla_tribunal e grupo (separador detectado: ',' ou ';').
+    df_mapa = pd.read_csv(caminho, sep=None, engine='python', encoding='utf-8', dtype=str)
+    return dict(zip(df_mapa['sigla_tribunal'].str.strip(), df_mapa['grupo'].str.strip()))
+
+def tribunais_sem_grupo(df_somas: pd.DataFrame, grupo_por_sigla: Dict[str, str]) -> list[str]:
+    return sorted(set(df_somas['sigla_tribunal'].dropna()) - set(grupo_por_sigla))
+
+def salvar_agregacao(df_grupos: pd.DataFrame, caminho: str, coluna_grupo: Optional[str] = None):
+    if coluna_grupo:
+        df_grupos = df_grupos.rename(columns={'grupo': coluna_grupo})
+    salvar_resumo_csv(df_grupos, caminho)
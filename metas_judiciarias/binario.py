@@ -0,0 +1,75 @@
+import json
+import os
+import shutil
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache import valor_para_json
+from .configuracao import COLUNAS_NUMERICAS_METAS
+
+# Sobe quando o layout das pastas ou a leitura dos valores muda, para que conversões antigas sejam refeitas.
+VERSAO_CACHE_BINARIO = 2
+# O cache binário só guarda as colunas das metas; com consolidado, o arquivo inteiro precisa ser lido do CSV, então as duas
+# versões só usam o cache com o consolidado desligado.
+
+def pasta_binaria_do_arquivo(pasta_cache: str, caminho_csv: str) -> str:
+    return os.path.join(pasta_cache, os.path.splitext(os.path.basename(caminho_csv))[0])
+
+def carregar_colunas_binarias(pasta_cache: str, caminho_csv: str,
+                              colunas_usadas: Optional[Sequence[str]] = None) -> Optional[Tuple[Dict[str, np.ndarray], dict]]:
+    pasta_arquivo = pasta_binaria_do_arquivo(pasta_cache, caminho_csv)
+    try:
+        with open(os.path.join(pasta_arquivo, 'manifesto.json'), encoding='utf-8') as f_manifesto:
+            manifesto = json.load(f_manifesto)
+    except (OSError, ValueError):
+        return None
+
+    estado_arquivo = os.stat(caminho_csv)
+    if (manifesto.get('versao') != VERSAO_CACHE_BINARIO or manifesto['tamanho'] != estado_arquivo.st_size
+            or manifesto['mtime_ns'] != estado_arquivo.st_mtime_ns):
+        return None
+    # colunas_usadas (do índice, já com os nomes do período) limita a carga às colunas que as metas do arquivo usam.
+    colunas_necessarias = [c for c in (colunas_usadas or manifesto['cabecalho']) if c in COLUNAS_NUMERICAS_METAS]
+    if not set(colunas_necessarias) <= set(manifesto['colunas']):
+        return None
+
+    # mmap_mode='r': nada é copiado; as páginas vêm do cache do sistema operacional e são compartilhadas entre os workers.
+    colunas = {col: np.load(os.path.join(pasta_arquivo, f'{col}.npy'), mmap_mode='r') for col in colunas_necessarias}
+    return colunas, manifesto
+
+def salvar_colunas_binarias(pasta_cache: str, caminho_csv: str, df: pd.DataFrame) -> bool:
+    colunas_metas = [c for c in df.columns if c in COLUNAS_NUMERICAS_METAS]
+    try:
+        vetores = {col: df[col].to_numpy(dtype='float64', na_value=np.nan) for col in colunas_metas}
+    except (TypeError, ValueError):
+        # Coluna com texto: o cálculo dela depende do pandas, então o arquivo continua sendo lido do CSV.
+        return False
+
+    estado_arquivo = os.stat(caminho_csv)
+    pasta_arquivo = pasta_binaria_do_arquivo(pasta_cache, caminho_csv)
+    pasta_tmp = pasta_arquivo + '.tmp'
+    shutil.rmtree(pasta_tmp, ignore_errors=True)
+    os.makedirs(pasta_tmp)
+    for col, vetor in vetores.items():
+        np.save(os.path.join(pasta_tmp, f'{col}.npy'), vetor)
+    manifesto = {'versao': VERSAO_CACHE_BINARIO, 'tamanho': estado_arquivo.st_size, 'mtime_ns': estado_arquivo.st_mtime_ns,
+                 'linhas': len(df), 'cabecalho': df.columns.tolist(), 'colunas': colunas_metas,
+                 'sigla_tribunal': df['sigla_tribunal'].iloc[0], 'ramo_justica': df['ramo_justica'].iloc[0]}
+    with open(os.path.join(pasta_tmp, 'manifesto.json'), 'w', encoding='utf-8') as f_manifesto:
+        json.dump(manifesto, f_manifesto, ensure_ascii=False, default=valor_para_json)
+
+    shutil.rmtree(pasta_arquivo, ignore_errors=True)
+    os.replace(pasta_tmp, pasta_arquivo)
+    return True
+
+def somar_colunas_binarias(colunas: Dict[str, np.ndarray]) -> Tuple[Dict[str, float], set]:
+    somas, colunas_com_valor = {}, set()
+    for col, valores in colunas.items():
+        # Máscara de 1 byte por linha em vez de uma cópia sem NaN; mesma soma que df[col].sum() com skipna.
+        mascara_valores = ~np.isnan(valores)
+        somas[col] = float(np.sum(valores, where=mascara_valores))
+        if mascara_valores.any():
+            colunas_com_valor.add(col)
+    return somas, colunas_com_valor
@@ -0,0 +1,77 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from .configuracao import COLUNAS_META1, configuracoes_metas_stj, configuracoes_outras_metas, fatores_metas_por_ramo
+
+log = logging.getLogger("rich")
+
+# Sobe quando o formato das entradas ou a leitura dos valores muda, para que caches antigos sejam descartados.
+VERSAO_CACHE = 4
+
+def valor_para_json(valor):
+    # Escalares NumPy (np.int64, np.float64...) viram os tipos nativos do Python; o resto vai como texto.
+    return valor.item() if hasattr(valor, 'item') else str(valor)
+
+def calcular_assinatura_configuracao() -> str:
+    conteudo = json.dumps([VERSAO_CACHE, fatores_metas_por_ramo, configuracoes_outras_metas, configuracoes_metas_stj, COLUNAS_META1],
+                          sort_keys=True)
+    return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def calcular_hash_conteudo(caminho: str) -> str:
+    hash_arquivo = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(1024 * 1024), b''):
+            hash_arquivo.update(bloco)
+    return hash_arquivo.hexdigest()
+
+def carregar_cache_metas(arquivo_cache: str) -> Dict[str, dict]:
+    try:
+        with open(arquivo_cache, encoding='utf-8') as f_cache:
+            cache = json.load(f_cache)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('assinatura_configuracao') != calcular_assinatura_configuracao():
+        log.info("Fatores ou configuração das metas mudaram desde o último cache; recalculando tudo.")
+        return {}
+    return cache.get('arquivos', {})
+
+def consultar_cache_metas(entradas_cache: Dict[str, dict], caminho: str) -> Optional[tuple]:
+    entrada = entradas_cache.get(caminho)
+    if not entrada:
+        return None
+    estado_arquivo = os.stat(caminho)
+    if entrada['tamanho'] != estado_arquivo.st_size:
+        return None
+    if entrada['mtime_ns'] != estado_arquivo.st_mtime_ns:
+        # Mesmo tamanho com data diferente (ex.: arquivo copiado de novo): confirma pelo conteúdo.
+        if entrada['sha256'] != calcular_hash_conteudo(caminho):
+            return None
+        entrada['mtime_ns'] = estado_arquivo.st_mtime_ns
+    return tuple(entrada['resultado'])
+
+def registrar_no_cache(entradas_cache: Dict[str, dict], caminho: str, resultado: tuple, somas: Optional[list] = None):
+    linha_res, _, aviso_res = resultado
+    if linha_res is None and aviso_res and aviso_res.startswith("Erro crítico"):
+        return
+    # O SHA-256 custa uma leitura a mais do arquivo: quem chama só registra quando o cache vai ser lido depois.
+    estado_arquivo = os.stat(caminho)
+    entradas_cache[caminho] = {'tamanho': estado_arquivo.st_size,
+                               'mtime_ns': estado_arquivo.st_mtime_ns,
+                               'sha256': calcular_hash_conteudo(caminho),
+                               'resultado': list(resultado),
+                               # Somas brutas do tribunal (None onde a coluna não tem valor), para as agregações por grupo.
+                               'somas': None if somas is None else [None if valor != valor else valor for valor in somas]}
+
+def consultar_somas_cache(entradas_cache: Dict[str, dict], caminho: str) -> Optional[list]:
+    entrada = entradas_cache.get(caminho)
+    return entrada.get('somas') if entrada else None
+
+def salvar_cache_metas(entradas_cache: Dict[str, dict], arquivo_cache: str):
+    caminho_tmp = arquivo_cache + '.tmp'
+    with open(caminho_tmp, 'w', encoding='utf-8') as f_cache:
+        json.dump({'assinatura_configuracao': calcular_assinatura_configuracao(), 'arquivos': entradas_cache},
+                  f_cache, ensure_ascii=False, default=valor_para_json)
+    os.replace(caminho_tmp, arquivo_cache)
@@ -0,0 +1,103 @@
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .configuracao import (COLUNAS_NUMERICAS_METAS, configuracoes_metas_stj, configuracoes_outras_metas,
+                           fatores_metas_por_ramo, fatores_padrao_je, obter_fatores_por_ramo)
+
+def somar_colunas_metas(df: pd.DataFrame) -> Tuple[Dict[str, float], set]:
+    colunas_presentes = [c for c in COLUNAS_NUMERICAS_METAS if c in df.columns]
+    colunas_numericas = [c for c in colunas_presentes if pd.api.types.is_numeric_dtype(df[c])]
+    somas = df[colunas_numericas].sum().astype('float64').to_dict()
+    for col in colunas_presentes:
+        if col in somas:
+            continue
+        # Coluna lida como texto: os números em texto contam; com algum texto de verdade, a soma é NaN e a meta fica 'NA',
+        # como no cálculo coluna a coluna (e continua NaN quando blocos ou faixas do arquivo são somados).
+        valores = pd.to_numeric(df[col], errors='coerce')
+        somas[col] = np.nan if (valores.isna() & df[col].notna()).any() else float(valores.sum())
+    com_valor = df[colunas_presentes].notna().any()
+    return somas, {col for col in colunas_presentes if com_valor[col]}
+
+def acumular_somas(somas_total: Dict[str, float], colunas_com_valor_total: set, somas: Dict[str, float], colunas_com_valor: set):
+    for col, valor in somas.items():
+        somas_total[col] = somas_total.get(col, 0.0) + valor
+    colunas_com_valor_total.update(colunas_com_valor)
+
+def montar_vetor_fatores(fatores_do_ramo: dict) -> np.ndarray:
+    fatores = [100.0]
+    fatores += [fatores_do_ramo.get(chave, fatores_padrao_je.get(chave, np.nan)) for *_, chave in configuracoes_outras_metas.values()]
+    fatores += [fatores_do_ramo.get(chave, np.nan) for *_, chave in configuracoes_metas_stj.values()]
+    return np.array(fatores, dtype='float64')
+
+# Tabela fixa das metas (Meta 1, outras metas e variantes do STJ, nessa ordem) sobre o vetor de somas de COLUNAS_NUMERICAS_METAS.
+POSICAO_COLUNA_METAS = {col: i for i, col in enumerate(COLUNAS_NUMERICAS_METAS)}
+NOMES_METAS_VETORIZADAS = ['meta1'] + list(configuracoes_outras_metas) + list(configuracoes_metas_stj)
+DEFINICOES_METAS_VETORIZADAS = ([('julgados_2025', 'casos_novos_2025', 'suspensos_2025', None)]
+                                + list(configuracoes_outras_metas.values()) + list(configuracoes_metas_stj.values()))
+INDICES_JULGADOS = np.array([POSICAO_COLUNA_METAS[j] for j, _, _, _ in DEFINICOES_METAS_VETORIZADAS])
+INDICES_DISTRIBUIDOS = np.array([POSICAO_COLUNA_METAS[d] for _, d, _, _ in DEFINICOES_METAS_VETORIZADAS])
+INDICES_SUSPENSOS = np.array([POSICAO_COLUNA_METAS[s] for _, _, s, _ in DEFINICOES_METAS_VETORIZADAS])
+INDICE_DESSOBRESTADOS = POSICAO_COLUNA_METAS['dessobrestados_2025']
+INICIO_METAS_STJ = len(NOMES_METAS_VETORIZADAS) - len(configuracoes_metas_stj)
+FATORES_VETORIZADOS_POR_RAMO = {ramo: montar_vetor_fatores(fatores) for ramo, fatores in fatores_metas_por_ramo.items()}
+
+def montar_vetor_somas(somas: Dict[str, float], colunas_com_valor: set) -> Tuple[np.ndarray, np.ndarray]:
+    vetor_somas = np.full(len(COLUNAS_NUMERICAS_METAS), np.nan)
+    vetor_com_valor = np.zeros(len(COLUNAS_NUMERICAS_METAS), dtype=bool)
+    for col, valor in somas.items():
+        posicao = POSICAO_COLUNA_METAS.get(col)
+        if posicao is None:
+            continue
+        try:
+            vetor_somas[posicao] = valor
+        except (TypeError, ValueError):
+            # Soma não numérica (coluna de texto): a meta fica 'NA', como no cálculo coluna a coluna.
+            continue
+        vetor_com_valor[posicao] = col in colunas_com_valor
+    return vetor_somas, vetor_com_valor
+
+def calcular_metas_por_somas(somas: Dict[str, float], colunas_com_valor: set, ramo_justica: str, sigla_tribunal: str) -> Dict[str, str | float]:
+    return calcular_metas_por_vetores(*montar_vetor_somas(somas, colunas_com_valor), ramo_justica, sigla_tribunal)
+
+def calcular_metas_por_vetores(vetor_somas: np.ndarray, vetor_com_valor: np.ndarray, ramo_justica: str, sigla_tribunal: str) -> Dict[str, str | float]:
+    fatores_do_ramo, ramo_mapeado = obter_fatores_por_ramo(ramo_justica, sigla_tribunal)
+
+    julgados = vetor_somas[INDICES_JULGADOS]
+    dessobrestados = np.zeros(len(NOMES_METAS_VETORIZADAS))
+    if vetor_com_valor[INDICE_DESSOBRESTADOS]:
+        dessobrestados[0] = vetor_somas[INDICE_DESSOBRESTADOS]
+    denominadores = vetor_somas[INDICES_DISTRIBUIDOS] + dessobrestados - vetor_somas[INDICES_SUSPENSOS]
+    fatores = FATORES_VETORIZADOS_POR_RAMO[ramo_mapeado]
+
+    metas_validas = (vetor_com_valor[INDICES_JULGADOS] & vetor_com_valor[INDICES_DISTRIBUIDOS] & vetor_com_valor[INDICES_SUSPENSOS]
+                     & ~np.isnan(julgados) & ~np.isnan(denominadores) & (denominadores != 0) & ~np.isnan(fatores))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        valores_metas = np.round((julgados / denominadores) * fatores, 2)
+
+    metas_calculadas: Dict[str, str | float] = {}
+    for posicao in range(INICIO_METAS_STJ):
+        metas_calculadas[NOMES_METAS_VETORIZADAS[posicao]] = valores_metas[posicao] if metas_validas[posicao] else 'NA'
+
+    if ramo_mapeado == "Superior Tribunal de Justiça":
+        for posicao in range(INICIO_METAS_STJ, len(NOMES_METAS_VETORIZADAS)):
+            chave_fator = DEFINICOES_METAS_VETORIZADAS[posicao][3]
+            if chave_fator not in fatores_do_ramo:
+                continue
+            metas_calculadas[NOMES_METAS_VETORIZADAS[posicao]] = valores_metas[posicao] if metas_validas[posicao] else 'NA'
+            if metas_validas[posicao]:
+                metas_calculadas.pop(f'meta{chave_fator}a', None)
+                metas_calculadas.pop(f'meta{chave_fator}b', None)
+
+    return metas_calculadas
+
+def calcular_linha_metas(somas: Dict[str, float], colunas_com_valor: set, sigla_tribunal: str, ramo_justica: str) -> Dict[str, str | float]:
+    linha_resumo = {'sigla_tribunal': sigla_tribunal, 'ramo_justica': ramo_justica}
+    linha_resumo.update(calcular_metas_por_somas(somas, colunas_com_valor, ramo_justica, sigla_tribunal))
+    return linha_resumo
+
+def calcular_linha_metas_por_vetores(vetor_somas: np.ndarray, vetor_com_valor: np.ndarray, sigla_tribunal: str, ramo_justica: str) -> Dict[str, str | float]:
+    linha_resumo = {'sigla_tribunal': sigla_tribunal, 'ramo_justica': ramo_justica}
+    linha_resumo.update(calcular_metas_por_vetores(vetor_somas, vetor_com_valor, ramo_justica, sigla_tribunal))
+    return linha_resumo
@@ -0,0 +1,89 @@
+import logging
+
+log = logging.getLogger("rich")
+
+fatores_metas_por_ramo = {
+    'Justiça Estadual': {'2a': 1000/8, '2b': 1000/9, '2c': 1000/9.5, '2ant': 100,
+                          '4a': 1000/6.5, '4b': 100, '6': 100, '7a': 1000/5, '7b': 1000/5,
+                          '8a': 1000/7.5, '8b': 1000/9, '10a': 1000/9, '10b': 1000/10},
+    'Justiça do Trabalho': {'2a': 1000/9.4, '2ant': 100, '4a': 1000/7, '4b': 100},
+    'Justiça Federal': {'2a': 1000/8.5, '2b': 100, '2ant': 100, '4a': 1000/7, '4b': 100,
+                         '6': 1000/3.5, '7a': 1000/3.5, '7b': 1000/3.5, '8a': 1000/7.5,
+                         '8b': 1000/9, '10a': 100},
+    'Justiça Militar da União': {'2a': 1000/9.5, '2b': 1000/9.9, '2ant': 100,
+                                  '4a': 1000/9.5, '4b': 1000/9.9},
+    'Justiça Militar Estadual': {'2a': 1000/9, '2b': 1000/9.5, '2ant': 100,
+                                  '4a': 1000/9.5, '4b': 1000/9.9},
+    'Tribunal Superior Eleitoral': {'2a': 1000/7.0, '2b': 1000/9.9, '2ant': 100,
+                                     '4a': 1000/9, '4b': 1000/5},
+    'Tribunal Superior do Trabalho': {'2a': 1000/8.5, '2b': 1000/9.9, '2ant': 100,
+                                       '4a': 1000/7, '4b': 100},
+    'Superior Tribunal de Justiça': {'2ant': 100, '4a': 1000/9, '4b': 100,
+                                      '6': 1000/7.5, '7a': 1000/7.5, '7b': 1000/7.5,
+                                      '8': 1000/10, '10': 1000/10}
+}
+fatores_padrao_je = fatores_metas_por_ramo['Justiça Estadual']
+
+def mapear_ramo(ramo_justica: str, sigla_tribunal: str) -> str:
+    # Ramo cujos fatores se aplicam ao tribunal (TST, STJ e Justiça Eleitoral têm tabelas próprias).
+    mapeamento_especial = {
+        'Tribunais Superiores': {
+            'TST': 'Tribunal Superior do Trabalho',
+            'STJ': 'Superior Tribunal de Justiça'
+        },
+        'Justiça Eleitoral': 'Tribunal Superior Eleitoral'
+    }
+
+    if ramo_justica == 'Tribunais Superiores':
+        return mapeamento_especial[ramo_justica].get(sigla_tribunal, ramo_justica)
+    elif ramo_justica == 'Justiça Eleitoral':
+        return mapeamento_especial[ramo_justica]
+    return ramo_justica
+
+def obter_fatores_por_ramo(ramo_justica: str, sigla_tribunal: str) -> tuple[dict, str]:
+    ramo_usado = mapear_ramo(ramo_justica, sigla_tribunal)
+    if ramo_usado in fatores_metas_por_ramo:
+        return fatores_metas_por_ramo[ramo_usado], ramo_usado
+    else:
+        log.warning(f"[AVISO] Ramo '{ramo_justica}' (tribunal: {sigla_tribunal}) não tem fator específico. Usando padrão JE.")
+        return fatores_padrao_je, 'Justiça Estadual'
+
+COLUNAS_IDENTIFICACAO = ['sigla_tribunal', 'ramo_justica']
+ANO_COLUNAS_META1 = '2025'
+PREFIXOS_META1 = ['julgados', 'casos_novos', 'suspensos', 'dessobrestados']
+COLUNAS_META1 = [f'{prefixo}_{ANO_COLUNAS_META1}' for prefixo in PREFIXOS_META1]
+
+def mapear_colunas_do_ano(ano: str) -> dict[str, str]:
+    # Só as colunas da Meta 1 levam o ano no nome; as de outro ano são lidas com os nomes de COLUNAS_META1.
+    if str(ano) == ANO_COLUNAS_META1:
+        return {}
+    return {f'{prefixo}_{ano}': f'{prefixo}_{ANO_COLUNAS_META1}' for prefixo in PREFIXOS_META1}
+
+configuracoes_outras_metas = {
+    'meta2a': ('julgm2_a', 'distm2_a', 'suspm2_a', '2a'),
+    'meta2b': ('julgm2_b', 'distm2_b', 'suspm2_b', '2b'),
+    'meta2c': ('julgm2_c', 'distm2_c', 'suspm2_c', '2c'),
+    'meta2ant': ('julgm2_ant', 'distm2_ant', 'suspm2_ant', '2ant'),
+    'meta4a': ('julgm4_a', 'distm4_a', 'suspm4_a', '4a'),
+    'meta4b': ('julgm4_b', 'distm4_b', 'suspm4_b', '4b'),
+    'meta6': ('julgm6_a', 'distm6_a', 'suspm6_a', '6'),
+    'meta7a': ('julgm7_a', 'distm7_a', 'suspm7_a', '7a'),
+    'meta7b': ('julgm7_b', 'distm7_b', 'suspm7_b', '7b'),
+    'meta8a': ('julgm8_a', 'distm8_a', 'suspm8_a', '8a'),
+    'meta8b': ('julgm8_b', 'distm8_b', 'suspm8_b', '8b'),
+    'meta10a': ('julgm10_a', 'distm10_a', 'suspm10_a', '10a'),
+    'meta10b': ('julgm10_b', 'distm10_b', 'suspm10_b', '10b'),
+}
+configuracoes_metas_stj = {
+    'meta8_stj': ('julgm8', 'dism8', 'suspm8', '8'),
+    'meta10_stj': ('julgm10', 'dism10', 'suspm10', '10'),
+}
+
+def listar_colunas_numericas_metas() -> list[str]:
+    colunas = list(COLUNAS_META1)
+    for configuracoes in (configuracoes_outras_metas, configuracoes_metas_stj):
+        for j_col, d_col, s_col, _ in configuracoes.values():
+            colunas.extend((j_col, d_col, s_col))
+    return colunas
+
+COLUNAS_NUMERICAS_METAS = listar_colunas_numericas_metas()
@@ -0,0 +1,221 @@
+import concurrent.futures
+import itertools
+import logging
+import multiprocessing
+import os
+import queue
+import socket
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Optional, Tuple
+
+log = logging.getLogger("rich")
+
+# Nome da variável de ambiente com a chave compartilhada entre o coordenador e os nós (authkey do multiprocessing.connection).
+VARIAVEL_CHAVE = 'METAS_CHAVE_DISTRIBUIDA'
+
+def ler_endereco(texto: str) -> Tuple[str, int]:
+    host, _, porta = texto.rpartition(':')
+    return host or '127.0.0.1', int(porta)
+
+def executar_no(endereco: Tuple[str, int], chave: bytes):
+    # Nó de trabalho: pede tarefas ao coordenador, uma por vez, até receber 'fim' ou perder a conexão.
+    try:
+        conexao = Client(endereco, authkey=chave)
+        conexao.send(('pronto', os.getpid(), socket.gethostname()))
+        mensagem = conexao.recv()
+    except (EOFError, OSError):
+        # Coordenador já encerrado (ou fora do ar): não há o que fazer.
+        return
+    with conexao:
+        _, initializer, initargs = mensagem
+        if initializer is not None:
+            initializer(*initargs)
+        while True:
+            try:
+                mensagem = conexao.recv()
+            except EOFError:
+                return
+            if mensagem[0] == 'fim':
+                return
+            _, id_tarefa, fn, args, kwargs = mensagem
+            try:
+                resposta = ('ok', id_tarefa, fn(*args, **kwargs))
+            except Exception as e_tarefa:
+                resposta = ('erro', id_tarefa, e_tarefa)
+            try:
+                conexao.send(resposta)
+            except Exception as e_envio:
+                # Resultado ou exceção que não passa pelo pickle: o coordenador recebe só a descrição.
+                conexao.send(('erro', id_tarefa, RuntimeError(f"{type(e_envio).__name__}: {e_envio}")))
+
+def iniciar_nos(endereco: Tuple[str, int], chave: bytes, quantidade: int,
+                contexto: Optional[multiprocessing.context.BaseContext] = None) -> list:
+    # 'spawn' por padrão: como um nó remoto, o processo não herda nada do coordenador.
+    contexto = contexto or multiprocessing.get_context('spawn')
+    processos = []
+    for _ in range(quantidade):
+        processo = contexto.Process(target=executar_no, args=(endereco, chave), daemon=True)
+        processo.start()
+        processos.append(processo)
+    return processos
+
+class ExecutorDistribuido(concurrent.futures.Executor):
+    # Coordenador: escuta num socket TCP e distribui as tarefas aos nós que se conectam (máquinas remotas ou processos
+    # locais que fazem o papel delas). Cada nó puxa a próxima tarefa quando termina a anterior; tarefas de um nó que
+    # caiu, ou que falharam, voltam para a fila até `max_tentativas`.
+    def __init__(self, max_workers: Optional[int] = None, initializer: Optional[Callable] = None, initargs: tuple = (),
+                 endereco: Tuple[str, int] = ('127.0.0.1', 0), chave: Optional[bytes] = None, nos_locais: Optional[int] = None,
+                 max_tentativas: int = 3, mp_context: Optional[multiprocessing.context.BaseContext] = None):
+        if chave is None:
+            if endereco[0] not in ('127.0.0.1', 'localhost'):
+                raise ValueError(f"Coordenador exposto na rede exige uma chave compartilhada (variável {VARIAVEL_CHAVE}).")
+            # Só nós locais: uma chave aleatória basta, e os processos a recebem na criação.
+            chave = os.urandom(32)
+        self._chave = chave
+        self._initializer = initializer
+        self._initargs = initargs
+        self._max_tentativas = max_tentativas
+        self._contexto = mp_context
+        self._fila: queue.Queue = queue.Queue()
+        self._pendentes: dict = {}
+        self._ids = itertools.count()
+        self._trava = threading.Lock()
+        self._encerrando = False
+        self._conexoes: list[threading.Thread] = []
+        self._ouvinte = Listener(endereco, authkey=chave)
+        self.endereco = self._ouvinte.address
+
+        num_nos_locais = (max_workers or 1) if nos_locais is None else nos_locais
+        self._processos_locais = {processo.pid: processo for processo in iniciar_nos(self.endereco, chave, num_nos_locais, mp_context)}
+        self._thread_aceite = threading.Thread(target=self._aceitar, name='coordenador', daemon=True)
+        self._thread_aceite.start()
+        log.info(f"Coordenador distribuído em {self.endereco[0]}:{self.endereco[1]} ({num_nos_locais} nós locais).")
+
+    def submit(self, fn, /, *args, **kwargs) -> concurrent.futures.Future:
+        futuro = concurrent.futures.Future()
+        with self._trava:
+            if self._encerrando:
+                raise RuntimeError('Executor distribuído já encerrado.')
+            id_tarefa = next(self._ids)
+            self._pendentes[id_tarefa] = (futuro, fn, args, kwargs, 0)
+        self._fila.put(id_tarefa)
+        return futuro
+
+    def _aceitar(self):
+        while True:
+            try:
+                conexao = self._ouvinte.accept()
+            except OSError:
+                return
+            except Exception as e_aceite:
+                log.warning(f"[DISTRIBUÍDO] Conexão recusada: {e_aceite}")
+                continue
+            with self._trava:
+                if self._encerrando:
+                    conexao.close()
+                    return
+                thread_no = threading.Thread(target=self._atender_no, args=(conexao,), name='no', daemon=True)
+                self._conexoes.append(thread_no)
+            thread_no.start()
+
+    def _atender_no(self, conexao):
+        id_tarefa = pid_no = None
+        try:
+            _, pid_no, host_no = conexao.recv()
+            conexao.send(('iniciar', self._initializer, self._initargs))
+            while True:
+                id_tarefa = self._fila.get()
+                if id_tarefa is None:
+                    conexao.send(('fim',))
+                    return
+                with self._trava:
+                    futuro, fn, args, kwargs, tentativas = self._pendentes[id_tarefa]
+                # Numa nova tentativa o Future já está em execução.
+                if tentativas == 0 and not futuro.set_running_or_notify_cancel():
+                    with self._trava:
+                        del self._pendentes[id_tarefa]
+                    id_tarefa = None
+                    continue
+                try:
+                    conexao.send(('tarefa', id_tarefa, fn, args, kwargs))
+                except OSError:
+                    raise
+                except Exception as e_envio:
+                    # Tarefa que não passa pelo pickle falharia em qualquer nó: não há o que repetir.
+                    with self._trava:
+                        del self._pendentes[id_tarefa]
+                    futuro.set_exception(e_envio)
+                    id_tarefa = None
+                    continue
+                situacao, _, valor = conexao.recv()
+                if situacao == 'ok':
+                    with self._trava:
+                        del self._pendentes[id_tarefa]
+                    futuro.set_result(valor)
+                else:
+                    self._repetir(id_tarefa, valor, f"{host_no}:{pid_no}")
+                id_tarefa = None
+        except (EOFError, OSError) as e_conexao:
+            log.warning(f"[DISTRIBUÍDO] Nó {pid_no} desconectado: {e_conexao!r}")
+            if id_tarefa is not None:
+                self._repetir(id_tarefa, e_conexao, f"nó {pid_no}")
+                # Só nós que caíram no meio de uma tarefa são repostos; um que falha ao iniciar cairia de novo.
+                self._repor_no_local(pid_no)
+        finally:
+            conexao.close()
+
+    def _repetir(self, id_tarefa: int, erro: BaseException, origem: str):
+        with self._trava:
+            futuro, fn, args, kwargs, tentativas = self._pendentes[id_tarefa]
+            tentativas += 1
+            if tentativas >= self._max_tentativas:
+                del self._pendentes[id_tarefa]
+            else:
+                self._pendentes[id_tarefa] = (futuro, fn, args, kwargs, tentativas)
+        if tentativas >= self._max_tentativas:
+            log.error(f"[DISTRIBUÍDO] Tarefa {id_tarefa} falhou {tentativas} vezes (última em {origem}): {erro!r}")
+            futuro.set_exception(erro)
+            return
+        log.warning(f"[DISTRIBUÍDO] Tarefa {id_tarefa} falhou em {origem} ({erro!r}); tentativa {tentativas + 1} de {self._max_tentativas}.")
+        self._fila.put(id_tarefa)
+
+    def _repor_no_local(self, pid_no: Optional[int]):
+        processo = self._processos_locais.pop(pid_no, None)
+        if processo is None:
+            return
+        processo.join(timeout=1)
+        with self._trava:
+            if self._encerrando:
+                return
+        # Um nó local que morreu (ex.: falta de memória) é substituído para não reduzir o paralelismo.
+        for novo_processo in iniciar_nos(self.endereco, self._chave, 1, self._contexto):
+            self._processos_locais[novo_processo.pid] = novo_processo
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False):
+        with self._trava:
+            if self._encerrando:
+                return
+            pendentes = [futuro for futuro, *_ in self._pendentes.values()]
+        if cancel_futures:
+            for futuro in pendentes:
+                futuro.cancel()
+        # As tarefas voltam para a fila quando um nó cai, então o 'fim' só é enviado depois que todas terminaram.
+        concurrent.futures.wait(pendentes)
+        with self._trava:
+            self._encerrando = True
+            conexoes = list(self._conexoes)
+        for _ in conexoes:
+            self._fila.put(None)
+        try:
+            # Acorda o accept() bloqueado para que a thread do coordenador veja o encerramento.
+            Client(self.endereco, authkey=self._chave).close()
+        except OSError:
+            pass
+        self._ouvinte.close()
+        if wait:
+            for thread_no in conexoes:
+                thread_no.join()
+            self._thread_aceite.join()
+            for processo in list(self._processos_locais.values()):
+                processo.join()
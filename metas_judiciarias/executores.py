@@ -0,0 +1,37 @@
+import concurrent.futures
+import multiprocessing
+from typing import Callable, Optional
+
+from .distribuido import ExecutorDistribuido
+
+class ExecutorSerial(concurrent.futures.Executor):
+    # Executa cada tarefa no próprio processo, no momento do submit; útil para depuração e para medir o custo do paralelismo.
+    def __init__(self, max_workers: Optional[int] = None, initializer: Optional[Callable] = None, initargs: tuple = ()):
+        if initializer is not None:
+            initializer(*initargs)
+
+    def submit(self, fn, /, *args, **kwargs) -> concurrent.futures.Future:
+        futuro = concurrent.futures.Future()
+        try:
+            futuro.set_result(fn(*args, **kwargs))
+        except Exception as e_tarefa:
+            futuro.set_exception(e_tarefa)
+        return futuro
+
+EXECUTORES = {
+    'serial': ExecutorSerial,
+    'threads': concurrent.futures.ThreadPoolExecutor,
+    'processos': concurrent.futures.ProcessPoolExecutor,
+    'distribuido': ExecutorDistribuido,
+}
+
+def criar_executor(tipo_executor: str, num_workers: int, initializer: Optional[Callable] = None,
+                   initargs: tuple = (), metodo_inicio: Optional[str] = None, **opcoes_executor) -> concurrent.futures.Executor:
+    if tipo_executor not in EXECUTORES:
+        raise ValueError(f"Executor '{tipo_executor}' desconhecido. Opções: {', '.join(EXECUTORES)}")
+    # Opções próprias do executor escolhido (ex.: endereço e nós locais do distribuído).
+    opcoes = dict(opcoes_executor)
+    if tipo_executor in ('processos', 'distribuido') and metodo_inicio:
+        # 'spawn' (padrão no Windows e no macOS) sobe um interpretador novo por worker; 'fork' copia o processo principal.
+        opcoes['mp_context'] = multiprocessing.get_context(metodo_inicio)
+    return EXECUTORES[tipo_executor](max_workers=num_workers, initializer=initializer, initargs=initargs, **opcoes)
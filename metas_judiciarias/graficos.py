@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import re
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .resumo import COLUNAS_METAS_RESUMO
+
+# Sobe quando o desenho muda, para que todos os gráficos sejam refeitos mesmo com os dados iguais.
+VERSAO_GRAFICOS = 1
+
+class Grafico(NamedTuple):
+    # Só o que o desenho usa: os workers recebem tuplas pequenas em vez do resumo inteiro.
+    caminho: str
+    titulo: str
+    rotulos: tuple
+    valores: tuple
+
+    def assinatura(self) -> str:
+        conteudo = json.dumps([VERSAO_GRAFICOS, self.titulo, self.rotulos, self.valores], ensure_ascii=False)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+def montar_grafico(df_resumo: pd.DataFrame, nome_meta: str, caminho: str, titulo: Optional[str] = None) -> Optional[Grafico]:
+    valores = pd.to_numeric(df_resumo[nome_meta], errors='coerce').to_numpy(dtype='float64')
+    validos = ~np.isnan(valores)
+    if not validos.any():
+        return None
+    rotulos, valores = df_resumo['sigla_tribunal'].to_numpy()[validos], valores[validos]
+    ordem = np.argsort(-valores, kind='stable')
+    return Grafico(caminho, titulo or f'Comparativo {nome_meta.upper()}',
+                   tuple(str(rotulo) for rotulo in rotulos[ordem]), tuple(valores[ordem].tolist()))
+
+def nome_pasta_ramo(ramo_justica: str) -> str:
+    return re.sub(r'[^\w-]+', '_', str(ramo_justica)).strip('_')
+
+def planejar_graficos(df_resumo: pd.DataFrame, pasta_graficos: str, caminhos_fixos: Optional[Dict[str, str]] = None,
+                      por_ramo: bool = True) -> list[Grafico]:
+    # Um gráfico por meta com valor (todos os tribunais) e, com por_ramo, um por meta e ramo em <pasta>/<ramo>/.
+    caminhos_fixos = caminhos_fixos or {}
+    metas = [c for c in COLUNAS_METAS_RESUMO if c in df_resumo.columns]
+    graficos = []
+    for nome_meta in metas:
+        grafico = montar_grafico(df_resumo, nome_meta, caminhos_fixos.get(nome_meta, os.path.join(pasta_graficos, f'{nome_meta}.png')))
+        if grafico is not None:
+            graficos.append(grafico)
+    if por_ramo:
+        for ramo_justica, df_ramo in df_resumo.groupby('ramo_justica', sort=True):
+            pasta_ramo = os.path.join(pasta_graficos, nome_pasta_ramo(ramo_justica))
+            for nome_meta in metas:
+                grafico = montar_grafico(df_ramo, nome_meta, os.path.join(pasta_ramo, f'{nome_meta}.png'),
+                                         f'Comparativo {nome_meta.upper()} – {ramo_justica}')
+                if grafico is not None:
+                    graficos.append(grafico)
+    return graficos
+
+def renderizar_grafico(grafico: Grafico) -> str:
+    # API orientada a objetos com o canvas Agg: nenhuma figura global do pyplot, então cada worker desenha os seus gráficos independentemente.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    # Tamanho pelo número de barras: o de todos os tribunais fica como antes; os de ramos com poucos tribunais, menores e mais rápidos.
+    num_barras = len(grafico.rotulos)
+    figura = Figure(figsize=(max(16, num_barras * 0.6), 10) if num_barras > 12 else (8, 6))
+    FigureCanvasAgg(figura)
+    eixo = figura.add_subplot()
+    eixo.bar(grafico.rotulos, grafico.valores, color='steelblue')
+    eixo.set_title(grafico.titulo)
+    eixo.tick_params(axis='x', labelrotation=90, labelsize=8)
+    figura.tight_layout()
+    figura.savefig(grafico.caminho)
+    return grafico.caminho
+
+def renderizar_graficos(graficos: list[Grafico]) -> list[str]:
+    return [renderizar_grafico(grafico) for grafico in graficos]
+
+def carregar_manifesto_graficos(caminho: str) -> Dict[str, str]:
+    try:
+        with open(caminho, encoding='utf-8') as f_manifesto:
+            return json.load(f_manifesto)
+    except (OSError, ValueError):
+        return {}
+
+def salvar_manifesto_graficos(manifesto: Dict[str, str], caminho: str):
+    caminho_tmp = caminho + '.tmp'
+    with open(caminho_tmp, 'w', encoding='utf-8') as f_manifesto:
+        json.dump(manifesto, f_manifesto, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(caminho_tmp, caminho)
+
+def graficos_desatualizados(graficos: list[Grafico], manifesto: Dict[str, str]) -> list[Grafico]:
+    # Mesmos dados (assinatura igual) e arquivo no lugar: o gráfico não é desenhado de novo.
+    return [grafico for grafico in graficos
+            if manifesto.get(grafico.caminho) != grafico.assinatura() or not os.path.exists(grafico.caminho)]
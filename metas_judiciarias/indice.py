@@ -0,0 +1,52 @@
+import csv
+import os
+from typing import NamedTuple, Optional
+
+from .calculo import DEFINICOES_METAS_VETORIZADAS, INICIO_METAS_STJ
+from .configuracao import COLUNAS_IDENTIFICACAO, fatores_metas_por_ramo, mapear_colunas_do_ano, mapear_ramo
+
+class EntradaIndice(NamedTuple):
+    caminho: str
+    tamanho: int
+    sigla_tribunal: Optional[str] = None
+    ramo_justica: Optional[str] = None
+    # Colunas a ler para as metas, com os nomes do arquivo: identificação e só as colunas de metas que podem ser calculadas.
+    colunas_usadas: tuple = ()
+    # 'vazio', 'sem_identificacao' ou 'ilegivel': o arquivo não vai para os workers.
+    problema: Optional[str] = None
+    ramo_sem_fatores: bool = False
+
+def colunas_calculaveis(colunas_metas: set, ramo_mapeado: str) -> set:
+    # Uma meta só tem valor com as três colunas (julgados, distribuídos, suspensos) presentes; as do STJ, só no STJ.
+    num_definicoes = len(DEFINICOES_METAS_VETORIZADAS) if ramo_mapeado == 'Superior Tribunal de Justiça' else INICIO_METAS_STJ
+    colunas = set()
+    for col_j, col_d, col_s, chave_fator in DEFINICOES_METAS_VETORIZADAS[:num_definicoes]:
+        if {col_j, col_d, col_s} <= colunas_metas:
+            colunas.update((col_j, col_d, col_s))
+            if chave_fator is None and 'dessobrestados_2025' in colunas_metas:
+                colunas.add('dessobrestados_2025')
+    return colunas
+
+def indexar_arquivo(caminho: str, ano_colunas: str) -> EntradaIndice:
+    # Só o cabeçalho e a primeira linha: barato o bastante para rodar sobre todos os arquivos antes da leitura completa.
+    tamanho = os.path.getsize(caminho)
+    try:
+        with open(caminho, encoding='utf-8-sig', newline='') as f_csv:
+            leitor = csv.reader(f_csv)
+            cabecalho = next(leitor, None)
+            primeira_linha = next((linha for linha in leitor if linha), None)
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return EntradaIndice(caminho, tamanho, problema='ilegivel')
+    if not cabecalho or primeira_linha is None:
+        return EntradaIndice(caminho, tamanho, problema='vazio')
+    if not all(col in cabecalho for col in COLUNAS_IDENTIFICACAO):
+        return EntradaIndice(caminho, tamanho, problema='sem_identificacao')
+
+    valores = dict(zip(cabecalho, primeira_linha))
+    sigla_tribunal, ramo_justica = valores.get('sigla_tribunal'), valores.get('ramo_justica')
+    ramo_mapeado = mapear_ramo(ramo_justica, sigla_tribunal)
+    renomeacao = mapear_colunas_do_ano(ano_colunas)
+    colunas_uteis = colunas_calculaveis({renomeacao.get(c, c) for c in cabecalho}, ramo_mapeado)
+    colunas_usadas = tuple(c for c in cabecalho if c in COLUNAS_IDENTIFICACAO or renomeacao.get(c, c) in colunas_uteis)
+    return EntradaIndice(caminho, tamanho, sigla_tribunal, ramo_justica, colunas_usadas,
+                         ramo_sem_fatores=ramo_mapeado not in fatores_metas_por_ramo)
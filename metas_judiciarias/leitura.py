@@ -0,0 +1,138 @@
+import io
+import os
+from typing import Dict, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from .configuracao import COLUNAS_IDENTIFICACAO, COLUNAS_NUMERICAS_METAS, mapear_colunas_do_ano
+
+try:
+    import pyarrow  # noqa: F401
+    MOTOR_LEITURA_CSV = 'pyarrow'
+except ImportError:
+    MOTOR_LEITURA_CSV = 'c'
+
+# Renomeação das colunas do ano de referência em uso (vazia para ANO_COLUNAS_META1); definida por processo.
+renomeacao_colunas_periodo: Dict[str, str] = {}
+
+LIMITE_INT32 = (-2**31, 2**31 - 1)
+
+def definir_ano_colunas(ano: str):
+    global renomeacao_colunas_periodo
+    renomeacao_colunas_periodo = mapear_colunas_do_ano(ano)
+
+def nomes_colunas_do_periodo(colunas) -> list[str]:
+    return [renomeacao_colunas_periodo.get(c, c) for c in colunas]
+
+def aplicar_nomes_do_periodo(df: pd.DataFrame) -> pd.DataFrame:
+    # Cópia rasa: só os rótulos mudam, e o DataFrame original (que pode estar indo para o consolidado) fica intacto.
+    if not renomeacao_colunas_periodo:
+        return df
+    df_renomeado = df.copy(deep=False)
+    df_renomeado.columns = nomes_colunas_do_periodo(df.columns)
+    return df_renomeado
+
+def coluna_numerica_metas(coluna: str) -> bool:
+    return renomeacao_colunas_periodo.get(coluna, coluna) in COLUNAS_NUMERICAS_METAS
+
+def selecionar_colunas_metas(caminho: str) -> list[str]:
+    cabecalho = pd.read_csv(caminho, sep=',', encoding='utf-8', nrows=0).columns
+    return [c for c in cabecalho if c in COLUNAS_IDENTIFICACAO or coluna_numerica_metas(c)]
+
+def compactar_inteiros(df: pd.DataFrame, colunas: Sequence[str]):
+    # Int32 só quando todos os valores cabem: o cast direto para int32 (no pyarrow ou no pandas) daria a volta sem erro.
+    for col in colunas:
+        minimo, maximo = df[col].min(), df[col].max()
+        if pd.isna(minimo) or (LIMITE_INT32[0] <= minimo and maximo <= LIMITE_INT32[1]):
+            df[col] = df[col].astype('Int32')
+
+def ler_csv_metas(caminho: str, colunas_usadas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    # Com o índice da pré-varredura, as colunas já vêm escolhidas e o cabeçalho não é lido de novo.
+    colunas_usadas = list(colunas_usadas) if colunas_usadas else selecionar_colunas_metas(caminho)
+    tipos_inteiros = {c: 'Int64' for c in colunas_usadas if coluna_numerica_metas(c)}
+    try:
+        df = pd.read_csv(caminho, sep=',', encoding='utf-8', on_bad_lines='skip',
+                         engine=MOTOR_LEITURA_CSV, usecols=colunas_usadas, dtype=tipos_inteiros)
+    except (ValueError, TypeError, OverflowError):
+        # Alguma coluna tem decimais, texto ou valores fora de int64: mantém o corte de colunas e deixa o pandas inferir.
+        df = pd.read_csv(caminho, sep=',', encoding='utf-8', on_bad_lines='skip', usecols=colunas_usadas)
+    else:
+        compactar_inteiros(df, list(tipos_inteiros))
+    return aplicar_nomes_do_periodo(df)
+
+def ler_csv_completo(caminho: str) -> pd.DataFrame:
+    return pd.read_csv(caminho, sep=',', encoding='utf-8', on_bad_lines='skip')
+
+def ler_csv_em_chunks(caminho: str, tamanho_chunk: int, todas_colunas: bool = False, colunas_usadas: Optional[Sequence[str]] = None):
+    if todas_colunas:
+        return pd.read_csv(caminho, sep=',', encoding='utf-8', on_bad_lines='skip', chunksize=tamanho_chunk)
+    # Sem dtype fixo: um texto numa coluna numérica faria a leitura falhar; somar_colunas_metas trata cada bloco.
+    colunas_usadas = list(colunas_usadas) if colunas_usadas else selecionar_colunas_metas(caminho)
+    return pd.read_csv(caminho, sep=',', encoding='utf-8', on_bad_lines='skip', usecols=colunas_usadas, chunksize=tamanho_chunk)
+
+def colunas_metas_em_float(df: pd.DataFrame) -> pd.DataFrame:
+    # Esquema único para o dataset Parquet: cada partição vem de um arquivo (ou parte) com tipos inferidos à parte, e
+    # int64 numa partição com double em outra impede a leitura do dataset. Texto numa coluna das metas vira nulo.
+    colunas = [c for c in df.columns if coluna_numerica_metas(c) and df[c].dtype != 'float64']
+    if not colunas:
+        return df
+    df = df.copy(deep=False)
+    for col in colunas:
+        df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+    return df
+
+def uniformizar_colunas_metas(df: pd.DataFrame) -> pd.DataFrame:
+    # Blocos e faixas têm o tipo inferido um a um: inteiros viram float64 para que a mesma coluna saia igual (10.0)
+    # em todas as partes do consolidado, tenha a parte vazios ou não.
+    tipos_float = {c: 'float64' for c in df.columns if coluna_numerica_metas(c) and pd.api.types.is_integer_dtype(df[c])}
+    return df.astype(tipos_float) if tipos_float else df
+
+def contar_aspas(f, num_bytes: int, tamanho_bloco: int = 1 << 20) -> int:
+    aspas = 0
+    while num_bytes > 0:
+        bloco = f.read(min(tamanho_bloco, num_bytes))
+        if not bloco:
+            break
+        aspas += bloco.count(b'"')
+        num_bytes -= len(bloco)
+    return aspas
+
+def dividir_em_faixas_de_bytes(caminho: str, tamanho_faixa: int) -> list[Tuple[int, int]]:
+    tamanho_total = os.path.getsize(caminho)
+    faixas = []
+    with open(caminho, 'rb') as f:
+        f.readline()
+        inicio = f.tell()
+        while inicio < tamanho_total:
+            fim = min(inicio + tamanho_faixa, tamanho_total)
+            if fim < tamanho_total:
+                # Avança até o fim da linha (a partir de um byte antes, para que cada faixa termine logo após um '\n'). Com
+                # um número ímpar de aspas desde o início da faixa, o '\n' está dentro de um campo entre aspas e a linha
+                # continua: segue até a próxima quebra fora de aspas.
+                f.seek(inicio)
+                aspas = contar_aspas(f, fim - 1 - inicio)
+                linha = f.readline()
+                aspas += linha.count(b'"')
+                while aspas % 2 and linha:
+                    linha = f.readline()
+                    aspas += linha.count(b'"')
+                fim = f.tell()
+            faixas.append((inicio, fim))
+            inicio = fim
+    return faixas
+
+def ler_faixa_de_bytes(caminho: str, inicio: int, fim: int, todas_colunas: bool = False,
+                       colunas_usadas: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    cabecalho = pd.read_csv(caminho, sep=',', encoding='utf-8', nrows=0).columns.tolist()
+    with open(caminho, 'rb') as f:
+        f.seek(inicio)
+        dados_faixa = f.read(fim - inicio)
+
+    opcoes_leitura = {}
+    if not todas_colunas:
+        if not colunas_usadas:
+            colunas_usadas = [c for c in cabecalho if c in COLUNAS_IDENTIFICACAO or coluna_numerica_metas(c)]
+        # Sem dtype fixo, como nos blocos: texto numa coluna numérica é tratado por somar_colunas_metas.
+        opcoes_leitura = {'usecols': colunas_usadas}
+    return pd.read_csv(io.BytesIO(dados_faixa), sep=',', encoding='utf-8', on_bad_lines='skip',
+                       header=None, names=cabecalho, **opcoes_leitura)
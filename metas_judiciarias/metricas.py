@@ -0,0 +1,143 @@
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Etapas conhecidas, na ordem do fluxo: medir_etapa/registrar_etapa recusam outros nomes e as métricas saem nessa ordem.
+ETAPAS = ('importacao', 'inicializacao_worker', 'indexacao', 'leitura', 'espera_leitura', 'conversao_binaria', 'calculo', 'consolidado', 'espera_escrita', 'concatenacao', 'transferencia', 'resumo', 'agregacao', 'grafico')
+
+_tempos_etapas: Dict[str, float] = {}
+_eventos_rastreamento: list[dict] = []
+_lock_tempos = threading.Lock()
+_rastrear = False
+_pasta_perfil: Optional[str] = None
+_perfilador: Optional[cProfile.Profile] = None
+
+def configurar_instrumentacao(rastrear: bool, pasta_perfil: Optional[str] = None):
+    # Chamada no processo principal e no inicializador de cada worker, que não herda esse estado com spawn.
+    global _rastrear, _pasta_perfil
+    _rastrear = rastrear
+    _pasta_perfil = pasta_perfil
+
+def registrar_evento(nome: str, categoria: str, inicio: float, duracao: float, detalhes: Optional[dict] = None):
+    if not _rastrear:
+        return
+    # Formato "Complete" do Chrome trace: ts/dur em microssegundos, com relógio de parede comum a todos os processos.
+    evento = {'name': nome, 'cat': categoria, 'ph': 'X', 'ts': inicio * 1e6, 'dur': duracao * 1e6,
+              'pid': os.getpid(), 'tid': threading.get_ident(), 'args': detalhes or {}}
+    with _lock_tempos:
+        _eventos_rastreamento.append(evento)
+
+@contextmanager
+def _medir(nome: str, categoria: str, acumular: bool, detalhes: dict):
+    inicio = time.time()
+    t0_etapa = time.perf_counter()
+    try:
+        yield detalhes
+    finally:
+        duracao = time.perf_counter() - t0_etapa
+        if acumular:
+            with _lock_tempos:
+                _tempos_etapas[nome] = _tempos_etapas.get(nome, 0.0) + duracao
+        if categoria == 'arquivo':
+            detalhes['pico_memoria_mb'] = medir_pico_memoria_mb()['principal']
+        registrar_evento(nome, categoria, inicio, duracao, detalhes)
+
+def validar_etapa(nome_etapa: str):
+    # Um nome digitado errado viraria uma etapa nova e sumiria dos totais de quem procura a etapa certa.
+    if nome_etapa not in ETAPAS:
+        raise ValueError(f"Etapa desconhecida: {nome_etapa!r} (esperado um de {', '.join(ETAPAS)})")
+
+def registrar_etapa(nome_etapa: str, inicio: float, duracao: float, detalhes: Optional[dict] = None):
+    # Para etapas que começam antes de haver onde abrir um `with` (importações, subida de um worker).
+    validar_etapa(nome_etapa)
+    with _lock_tempos:
+        _tempos_etapas[nome_etapa] = _tempos_etapas.get(nome_etapa, 0.0) + duracao
+    registrar_evento(nome_etapa, 'etapa', inicio, duracao, detalhes)
+
+def medir_etapa(nome_etapa: str, **detalhes):
+    validar_etapa(nome_etapa)
+    return _medir(nome_etapa, 'etapa', True, detalhes)
+
+def medir_arquivo(nome_do_arquivo: str, **detalhes):
+    # Evento que envolve todas as etapas de um arquivo (ou faixa); não entra nos totais para não contar tempo em dobro.
+    return _medir(nome_do_arquivo, 'arquivo', False, detalhes)
+
+def coletar_tempos_etapas() -> Dict[str, float]:
+    # Devolve e zera os tempos do processo atual; os workers chamam ao fim de cada tarefa.
+    with _lock_tempos:
+        tempos = dict(_tempos_etapas)
+        _tempos_etapas.clear()
+    return tempos
+
+def coletar_instrumentacao() -> dict:
+    with _lock_tempos:
+        eventos = list(_eventos_rastreamento)
+        _eventos_rastreamento.clear()
+    return {'tempos': coletar_tempos_etapas(), 'eventos': eventos, 'fim': time.time()}
+
+@contextmanager
+def perfilar_tarefa():
+    global _perfilador
+    if _pasta_perfil is None:
+        yield
+        return
+    if _perfilador is None:
+        _perfilador = cProfile.Profile()
+    _perfilador.enable()
+    try:
+        yield
+    finally:
+        _perfilador.disable()
+        # Regrava o acumulado do processo a cada tarefa, já que os workers do pool não têm um gancho de encerramento.
+        os.makedirs(_pasta_perfil, exist_ok=True)
+        _perfilador.dump_stats(os.path.join(_pasta_perfil, f'perfil_{os.getpid()}.prof'))
+
+def somar_tempos_etapas(tempos_total: Dict[str, float], tempos: Dict[str, float]):
+    for nome_etapa, duracao in tempos.items():
+        tempos_total[nome_etapa] = tempos_total.get(nome_etapa, 0.0) + duracao
+
+def ordenar_tempos_etapas(tempos: Dict[str, float]) -> Dict[str, float]:
+    # Ordem do fluxo em vez da ordem em que cada etapa apareceu pela primeira vez (que varia com o executor).
+    return {nome_etapa: tempos[nome_etapa] for nome_etapa in ETAPAS if nome_etapa in tempos}
+
+def medir_pico_memoria_mb() -> Dict[str, Optional[float]]:
+    if resource is None:
+        return {'principal': None, 'workers': None}
+    # ru_maxrss vem em KB no Linux e em bytes no macOS; para os filhos, é o pico do maior processo já finalizado.
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return {'principal': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor,
+            'workers': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / divisor}
+
+def salvar_metricas(caminho: str, metricas: dict):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    if 'tempos_etapas_s' in metricas:
+        metricas = {**metricas, 'tempos_etapas_s': ordenar_tempos_etapas(metricas['tempos_etapas_s'])}
+    with open(caminho, 'w', encoding='utf-8') as f_metricas:
+        json.dump(metricas, f_metricas, ensure_ascii=False, indent=2)
+
+def salvar_rastreamento(caminho: str, eventos: list[dict], pid_principal: int):
+    pasta = os.path.dirname(caminho)
+    if pasta:
+        os.makedirs(pasta, exist_ok=True)
+    eventos = sorted(eventos, key=lambda evento: evento['ts'])
+    with open(caminho, 'w', encoding='utf-8') as f_rastreamento:
+        if caminho.endswith('.jsonl'):
+            for evento in eventos:
+                f_rastreamento.write(json.dumps(evento, ensure_ascii=False) + '\n')
+            return
+        nomes_processos = [{'name': 'process_name', 'ph': 'M', 'pid': pid,
+                            'args': {'name': 'principal' if pid == pid_principal else f'worker {pid}'}}
+                           for pid in sorted({evento['pid'] for evento in eventos})]
+        json.dump({'traceEvents': nomes_processos + eventos, 'displayTimeUnit': 'ms'}, f_rastreamento, ensure_ascii=False)
@@ -0,0 +1,56 @@
+import collections
+import concurrent.futures
+import queue
+import threading
+from typing import Callable, Dict, Hashable, Iterable, Iterator, Tuple
+
+def ler_com_antecipacao(itens: Iterable, funcao_leitura: Callable, antecipacao: int = 1) -> Iterator[Tuple[object, concurrent.futures.Future]]:
+    # Enquanto o chamador processa um item, uma thread já lê os próximos `antecipacao` itens.
+    iterador = iter(itens)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='leitor') as leitor:
+        pendentes = collections.deque()
+        for item in iterador:
+            pendentes.append((item, leitor.submit(funcao_leitura, item)))
+            if len(pendentes) > antecipacao:
+                yield pendentes.popleft()
+        while pendentes:
+            yield pendentes.popleft()
+
+class EscritorAssincrono:
+    # Thread única que executa as escritas na ordem de envio; a fila limitada segura o leitor se o disco ficar para trás.
+    # Cada escrita leva uma chave (o arquivo de origem): a falha fica com a chave que a causou, e as escritas seguintes
+    # dessa chave são descartadas sem afetar as das outras.
+    def __init__(self, tamanho_fila: int = 2):
+        self._fila: queue.Queue = queue.Queue(maxsize=tamanho_fila)
+        self._falhas: Dict[Hashable, BaseException] = {}
+        self._thread = threading.Thread(target=self._executar, name='escritor', daemon=True)
+        self._thread.start()
+
+    def _executar(self):
+        while True:
+            tarefa = self._fila.get()
+            try:
+                if tarefa is None:
+                    return
+                chave, funcao, argumentos = tarefa
+                if chave not in self._falhas:
+                    funcao(*argumentos)
+            except Exception as e_escrita:
+                self._falhas[chave] = e_escrita
+            finally:
+                self._fila.task_done()
+
+    def enviar(self, chave: Hashable, funcao: Callable, *argumentos):
+        self._fila.put((chave, funcao, argumentos))
+
+    def aguardar(self) -> Dict[Hashable, BaseException]:
+        # Espera a fila esvaziar e devolve (zerando) as falhas desde a última chamada.
+        self._fila.join()
+        falhas, self._falhas = self._falhas, {}
+        return falhas
+
+    def fechar(self) -> Dict[Hashable, BaseException]:
+        self._fila.put(None)
+        self._thread.join()
+        falhas, self._falhas = self._falhas, {}
+        return falhas
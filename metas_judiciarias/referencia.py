@@ -0,0 +1,70 @@
+from typing import Dict, Optional
+
+import pandas as pd
+
+from .configuracao import configuracoes_outras_metas, fatores_metas_por_ramo, obter_fatores_por_ramo
+
+# Cálculo de referência coluna a coluna, como na versão original: não é usado na produção, só para conferir o cálculo
+# vetorizado de calculo.py (testes e VERIFICAR_PARIDADE_METAS).
+
+def calcular_meta_geral(df: pd.DataFrame, col_j: str, col_d: str, col_s: str, fator: Optional[float]) -> str | float:
+    try:
+        if not all(col in df.columns and df[col].notna().any() for col in (col_j, col_d, col_s)):
+            return 'NA'
+        
+        numerador = df[col_j].sum()
+        if pd.isna(numerador):
+            return 'NA'
+            
+        den = df[col_d].sum() - df[col_s].sum()
+        
+        if den == 0 or fator == 'NA' or pd.isna(fator):
+            return 'NA'
+            
+        return round((numerador / den) * fator, 2)
+    except Exception:
+        return 'NA'
+
+def calcular_metas_referencia(df: pd.DataFrame, ramo_justica: str, sigla_tribunal: str) -> Dict[str, str | float]:
+    metas_calculadas: Dict[str, str | float] = {}
+    fatores_do_ramo, ramo_mapeado = obter_fatores_por_ramo(ramo_justica, sigla_tribunal)
+    fatores_je_padronizados = fatores_metas_por_ramo['Justiça Estadual']
+
+    meta1_final = 'NA'
+    colunas_meta1_obrigatorias = ['julgados_2025', 'casos_novos_2025', 'suspensos_2025']
+    if all(c in df.columns and df[c].notna().any() for c in colunas_meta1_obrigatorias):
+        s_julgados_m1 = df['julgados_2025'].sum()
+        s_casos_novos_m1 = df['casos_novos_2025'].sum()
+        s_suspensos_m1 = df['suspensos_2025'].sum()
+        
+        s_dessobrestados_m1 = 0
+        if 'dessobrestados_2025' in df.columns and df['dessobrestados_2025'].notna().any():
+            s_dessobrestados_m1 = df['dessobrestados_2025'].sum()
+
+        if pd.isna(s_julgados_m1):
+             meta1_final = 'NA'
+        else:
+            den_m1 = s_casos_novos_m1 + s_dessobrestados_m1 - s_suspensos_m1
+            if den_m1 == 0:
+                meta1_final = 'NA'
+            else:
+                meta1_final = round((s_julgados_m1 / den_m1) * 100, 2)
+    metas_calculadas['meta1'] = meta1_final
+
+    for nome_meta_chave, (j_col, d_col, s_col, chave_fator) in configuracoes_outras_metas.items():
+        fator_aplicar = fatores_do_ramo.get(chave_fator, fatores_je_padronizados.get(chave_fator, 'NA'))
+        metas_calculadas[nome_meta_chave] = calcular_meta_geral(df, j_col, d_col, s_col, fator_aplicar)
+
+    if ramo_mapeado == "Superior Tribunal de Justiça":
+        if '8' in fatores_do_ramo:
+            metas_calculadas['meta8_stj'] = calcular_meta_geral(df, 'julgm8', 'dism8', 'suspm8', fatores_do_ramo.get('8'))
+            if metas_calculadas.get('meta8_stj') != 'NA':
+                metas_calculadas.pop('meta8a', None)
+                metas_calculadas.pop('meta8b', None)
+        if '10' in fatores_do_ramo:
+            metas_calculadas['meta10_stj'] = calcular_meta_geral(df, 'julgm10', 'dism10', 'suspm10', fatores_do_ramo.get('10'))
+            if metas_calculadas.get('meta10_stj') != 'NA':
+                metas_calculadas.pop('meta10a', None)
+                metas_calculadas.pop('meta10b', None)
+
+    return metas_calculadas
@@ -0,0 +1,70 @@
+import os
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from .calculo import NOMES_METAS_VETORIZADAS
+
+def ordenar_colunas_resumo(colunas: list[str]) -> list[str]:
+    cols_principais = ['sigla_tribunal', 'ramo_justica', 'meta1']
+    cols_metas_num = sorted([c for c in colunas if c.startswith('meta') and c != 'meta1' and not c.endswith('_stj')])
+    cols_metas_stj = sorted([c for c in colunas if c.endswith('_stj')])
+
+    ordem_colunas = cols_principais + cols_metas_num + cols_metas_stj
+    ordem_colunas.extend(sorted([c for c in colunas if c not in ordem_colunas]))
+    return ordem_colunas
+
+# Ordem fixa de todas as colunas que o cálculo pode produzir; o resumo usa as que aparecem em pelo menos uma linha.
+COLUNAS_RESUMO = ordenar_colunas_resumo(['sigla_tribunal', 'ramo_justica'] + NOMES_METAS_VETORIZADAS)
+COLUNAS_METAS_RESUMO = COLUNAS_RESUMO[2:]
+POSICAO_META_RESUMO = {nome: posicao for posicao, nome in enumerate(COLUNAS_METAS_RESUMO)}
+
+def montar_resumo(resultados: list[dict]) -> pd.DataFrame:
+    # Metas em float64 com NaN no lugar de 'NA'; o texto 'NA' só aparece na escrita (salvar_resumo_csv).
+    valores_metas = np.full((len(resultados), len(COLUNAS_METAS_RESUMO)), np.nan)
+    metas_presentes = np.zeros(len(COLUNAS_METAS_RESUMO), dtype=bool)
+    siglas, ramos = [], []
+    for num_linha, linha_resumo in enumerate(resultados):
+        siglas.append(linha_resumo.get('sigla_tribunal'))
+        ramos.append(linha_resumo.get('ramo_justica'))
+        for nome_meta, valor_meta in linha_resumo.items():
+            posicao = POSICAO_META_RESUMO.get(nome_meta)
+            if posicao is None:
+                continue
+            metas_presentes[posicao] = True
+            if not isinstance(valor_meta, str):
+                valores_metas[num_linha, posicao] = valor_meta
+
+    df_resumo = pd.DataFrame(valores_metas[:, metas_presentes],
+                             columns=[nome for nome, presente in zip(COLUNAS_METAS_RESUMO, metas_presentes) if presente])
+    df_resumo.insert(0, 'ramo_justica', ramos)
+    df_resumo.insert(0, 'sigla_tribunal', siglas)
+    return df_resumo
+
+def salvar_resumo_csv(df_resumo: pd.DataFrame, caminho: str):
+    df_resumo.to_csv(caminho, index=False, encoding='utf-8', sep=';', na_rep='NA')
+
+class EscritorResumoIncremental:
+    # Acrescenta cada tribunal ao resumo assim que ele termina; no fim, o arquivo é regravado na ordem e com as colunas finais.
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self.colunas = COLUNAS_RESUMO
+        self._arquivo = open(caminho, 'w', encoding='utf-8', newline='')
+        self._arquivo.write(';'.join(self.colunas) + '\n')
+
+    def adicionar(self, linha_resumo: Optional[dict]):
+        if not linha_resumo:
+            return
+        df_linha = montar_resumo([linha_resumo]).reindex(columns=self.colunas)
+        self._arquivo.write(df_linha.to_csv(index=False, header=False, sep=';', na_rep='NA'))
+        self._arquivo.flush()
+
+    def finalizar(self, df_resumo: Optional[pd.DataFrame]):
+        self._arquivo.close()
+        if df_resumo is None:
+            os.remove(self.caminho)
+            return
+        caminho_tmp = self.caminho + '.tmp'
+        salvar_resumo_csv(df_resumo, caminho_tmp)
+        os.replace(caminho_tmp, self.caminho)
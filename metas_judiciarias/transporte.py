@@ -0,0 +1,52 @@
+from multiprocessing import resource_tracker, shared_memory
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+from .configuracao import COLUNAS_NUMERICAS_METAS
+
+def preparar_rastreador_memoria():
+    # Chamado antes de criar o pool: workers criados por fork herdam este rastreador de recursos. Sem ele, cada worker que
+    # abre a memória pelo nome sobe um rastreador próprio, que ao sair dá o segmento como vazado e o remove, mesmo em uso.
+    resource_tracker.ensure_running()
+
+class SomasCompartilhadas:
+    # Matriz em memória compartilhada com uma linha por arquivo (ou faixa): as somas de COLUNAS_NUMERICAS_METAS em
+    # float64 e, logo depois, a máscara de colunas com valor. Os workers gravam direto na sua linha e nada passa pelo pickle.
+    def __init__(self, num_posicoes: int, nome: Optional[str] = None):
+        num_colunas = len(COLUNAS_NUMERICAS_METAS)
+        tamanho_somas = num_posicoes * num_colunas * np.dtype('float64').itemsize
+        self.dono = nome is None
+        if self.dono:
+            self.memoria = shared_memory.SharedMemory(create=True, size=max(1, tamanho_somas + num_posicoes * num_colunas))
+        else:
+            self.memoria = shared_memory.SharedMemory(name=nome)
+        self.num_posicoes = num_posicoes
+        self.somas = np.ndarray((num_posicoes, num_colunas), dtype='float64', buffer=self.memoria.buf)
+        self.com_valor = np.ndarray((num_posicoes, num_colunas), dtype=bool, buffer=self.memoria.buf, offset=tamanho_somas)
+        if self.dono:
+            self.somas[:] = np.nan
+            self.com_valor[:] = False
+
+    @property
+    def nome(self) -> str:
+        return self.memoria.name
+
+    def gravar(self, posicao: int, vetor_somas: np.ndarray, vetor_com_valor: np.ndarray):
+        self.somas[posicao] = vetor_somas
+        self.com_valor[posicao] = vetor_com_valor
+
+    def ler(self, posicoes: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        # Várias posições (faixas de um mesmo arquivo) são somadas; a cópia desacopla o resultado da memória compartilhada.
+        posicoes = list(posicoes)
+        return self.somas[posicoes].sum(axis=0), self.com_valor[posicoes].any(axis=0)
+
+    def desconectar(self):
+        # As views do numpy precisam sair antes do close, senão o buffer continua exportado.
+        self.somas = self.com_valor = None
+        self.memoria.close()
+
+    def fechar(self):
+        self.desconectar()
+        if self.dono:
+            self.memoria.unlink()
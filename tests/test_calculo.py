@@ -0,0 +1,117 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metas_judiciarias import COLUNAS_NUMERICAS_METAS, acumular_somas, calcular_linha_metas, somar_colunas_metas
+from metas_judiciarias.referencia import calcular_metas_referencia
+
+# Paridade entre o cálculo vetorizado (um vetor de somas por arquivo) e o cálculo de referência coluna a coluna,
+# que reproduz a versão original. Os DataFrames vêm de texto CSV para que os tipos sejam os mesmos da leitura real.
+
+def montar_csv(sigla_tribunal: str, ramo_justica: str, num_linhas: int = 6, semente: int = 0, decimais: bool = False,
+               alteracoes=None) -> pd.DataFrame:
+    gerador = np.random.default_rng(semente)
+    dados = {'sigla_tribunal': [sigla_tribunal] * num_linhas, 'ramo_justica': [ramo_justica] * num_linhas}
+    for col in COLUNAS_NUMERICAS_METAS:
+        valores = gerador.integers(0, 60, num_linhas).astype(float)
+        if decimais:
+            valores = valores + gerador.integers(0, 4, num_linhas) * 0.25
+        # Suspensos pequenos: o denominador só zera nos casos montados de propósito.
+        dados[col] = valores / 10 if col.startswith('susp') else valores
+    df = pd.DataFrame(dados)
+    for col, valores in (alteracoes or {}).items():
+        df[col] = valores
+    texto_csv = df.to_csv(index=False)
+    return pd.read_csv(io.StringIO(texto_csv), sep=',', encoding='utf-8')
+
+def metas_vetorizadas(df: pd.DataFrame) -> dict:
+    somas, colunas_com_valor = somar_colunas_metas(df)
+    linha = calcular_linha_metas(somas, colunas_com_valor, df['sigla_tribunal'].iloc[0], df['ramo_justica'].iloc[0])
+    return normalizar({k: v for k, v in linha.items() if k.startswith('meta')})
+
+def metas_referencia(df: pd.DataFrame) -> dict:
+    return normalizar(calcular_metas_referencia(df, df['ramo_justica'].iloc[0], df['sigla_tribunal'].iloc[0]))
+
+def normalizar(metas: dict) -> dict:
+    return {k: v if v == 'NA' else float(v) for k, v in metas.items()}
+
+@pytest.mark.parametrize('sigla_tribunal, ramo_justica', [
+    ('TJAC', 'Justiça Estadual'),
+    ('TRT1', 'Justiça do Trabalho'),
+    ('TRF1', 'Justiça Federal'),
+    ('STM', 'Justiça Militar da União'),
+    ('TJMSP', 'Justiça Militar Estadual'),
+    ('TRE-01', 'Justiça Eleitoral'),
+    ('TST', 'Tribunais Superiores'),
+    ('STJ', 'Tribunais Superiores'),
+    ('XYZ', 'Ramo Desconhecido'),
+])
+@pytest.mark.parametrize('decimais', [False, True])
+def test_paridade_por_ramo(sigla_tribunal, ramo_justica, decimais):
+    df = montar_csv(sigla_tribunal, ramo_justica, decimais=decimais)
+    assert metas_vetorizadas(df) == metas_referencia(df)
+
+def test_colunas_todas_vazias():
+    vazio = [None] * 6
+    df = montar_csv('TJAC', 'Justiça Estadual', alteracoes={'julgm2_a': vazio, 'distm4_b': vazio, 'dessobrestados_2025': vazio})
+    metas = metas_vetorizadas(df)
+    assert metas == metas_referencia(df)
+    assert metas['meta2a'] == 'NA' and metas['meta4b'] == 'NA' and metas['meta1'] != 'NA'
+
+def test_colunas_ausentes():
+    df = montar_csv('TJAC', 'Justiça Estadual').drop(columns=['julgm6_a', 'suspm7_b', 'dessobrestados_2025'])
+    metas = metas_vetorizadas(df)
+    assert metas == metas_referencia(df)
+    assert metas['meta6'] == 'NA' and metas['meta7b'] == 'NA'
+
+def test_denominador_zero():
+    df = montar_csv('TJAC', 'Justiça Estadual', alteracoes={
+        'distm2_b': [3.0] * 6, 'suspm2_b': [3.0] * 6,
+        'casos_novos_2025': [2.0] * 6, 'suspensos_2025': [3.0] * 6, 'dessobrestados_2025': [1.0] * 6})
+    metas = metas_vetorizadas(df)
+    assert metas == metas_referencia(df)
+    assert metas['meta2b'] == 'NA' and metas['meta1'] == 'NA'
+
+@pytest.mark.parametrize('meta_valida', [True, False])
+def test_metas_do_stj(meta_valida):
+    # meta8_stj válida tira meta8a/meta8b do resultado; com denominador zero ela fica 'NA' e as variantes continuam.
+    alteracoes = {} if meta_valida else {'dism8': [1.0] * 6, 'suspm8': [1.0] * 6}
+    df = montar_csv('STJ', 'Tribunais Superiores', alteracoes=alteracoes)
+    metas = metas_vetorizadas(df)
+    assert metas == metas_referencia(df)
+    assert ('meta8a' in metas) != meta_valida
+    assert (metas['meta8_stj'] != 'NA') == meta_valida
+
+def test_metas_do_stj_so_no_stj():
+    df = montar_csv('TJAC', 'Justiça Estadual')
+    metas = metas_vetorizadas(df)
+    assert metas == metas_referencia(df)
+    assert 'meta8_stj' not in metas and 'meta10_stj' not in metas
+
+@pytest.mark.parametrize('coluna', ['julgm6_a', 'distm6_a', 'suspm6_a'])
+def test_texto_em_coluna_numerica(coluna):
+    valores = [4.0, 7.0, 'abc', 2.0, 9.0, 1.0]
+    df = montar_csv('TJAC', 'Justiça Estadual', alteracoes={coluna: valores})
+    metas = metas_vetorizadas(df)
+    assert metas == metas_referencia(df)
+    assert metas['meta6'] == 'NA'
+
+def test_numeros_como_texto():
+    # Coluna lida como texto só por causa das aspas: os valores continuam numéricos.
+    df = montar_csv('TJAC', 'Justiça Estadual')
+    df['julgm6_a'] = df['julgm6_a'].astype(str)
+    somas, _ = somar_colunas_metas(df)
+    assert somas['julgm6_a'] == pytest.approx(pd.to_numeric(df['julgm6_a']).sum())
+
+@pytest.mark.parametrize('tamanho_bloco', [1, 2, 4])
+def test_blocos_somam_como_o_arquivo_inteiro(tamanho_bloco):
+    # Cada bloco tem o tipo inferido separadamente; texto num bloco não pode derrubar a soma dos outros.
+    df = montar_csv('TJAC', 'Justiça Estadual', decimais=True, alteracoes={'julgm6_a': [4.0, 7.0, 'abc', 2.0, 9.0, 1.0]})
+    texto_csv = df.to_csv(index=False)
+    somas_total, colunas_com_valor_total = {}, set()
+    for bloco in pd.read_csv(io.StringIO(texto_csv), chunksize=tamanho_bloco):
+        acumular_somas(somas_total, colunas_com_valor_total, *somar_colunas_metas(bloco))
+    linha = calcular_linha_metas(somas_total, colunas_com_valor_total, 'TJAC', 'Justiça Estadual')
+    assert normalizar({k: v for k, v in linha.items() if k.startswith('meta')}) == metas_referencia(df)